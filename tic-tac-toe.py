@@ -1,9 +1,17 @@
 import tkinter as tk
 from tkinter import ttk
-import random
-from typing import List, Optional
+from typing import Optional
 import time
 
+from tictactoe import instrument
+from tictactoe.board import geometry_from_label, preset_labels
+from tictactoe.cache import SharedPositionCache
+from tictactoe.canvas import BoardCanvas
+from tictactoe.engine import DIFFICULTY_BUDGETS, SearchCancelled, SearchEngine
+from tictactoe.game import Game
+from tictactoe.tablebase import Tablebase
+from tictactoe.worker import SearchWorker
+
 class TicTacToe:
     def __init__(self):
         self.window = tk.Tk()
@@ -11,11 +19,16 @@ class TicTacToe:
         self.window.configure(bg='#1a2b3c')
         
         # تهيئة متغيرات اللعبة
-        self.current_player = 'X'
-        self.board = [''] * 9
+        self.game = Game()
+        self.board_size = tk.StringVar(value=self.game.geometry.label())
         self.difficulty = tk.StringVar(value='easy')
-        self.game_over = False
-        self.scores = {'X': 0, 'O': 0, 'tie': 0}
+        self.tablebase = Tablebase()
+        self.position_cache = SharedPositionCache()
+        self.engine = self.create_engine()
+        self.engine_difficulty = self.difficulty.get()
+        self.search_worker = SearchWorker(self.window)
+        self.computer_move_job = None
+        self.move_clicked_at = None
         
         self.setup_ui()
         
@@ -44,7 +57,16 @@ class TicTacToe:
                                          values=['easy', 'medium', 'hard'],
                                          state='readonly',
                                          style='Difficulty.TCombobox')
-        difficulty_selector.pack()
+        difficulty_selector.pack(side='left', padx=5)
+        
+        # اختيار حجم اللوحة
+        size_selector = ttk.Combobox(difficulty_frame,
+                                   textvariable=self.board_size,
+                                   values=preset_labels(),
+                                   state='readonly',
+                                   style='Difficulty.TCombobox')
+        size_selector.pack(side='left', padx=5)
+        size_selector.bind('<<ComboboxSelected>>', lambda e: self.change_board_size())
         
         # لوحة النتائج
         self.create_scoreboard()
@@ -85,17 +107,17 @@ class TicTacToe:
     def create_game_board(self):
         self.board_frame = tk.Frame(self.container, bg='#1a2b3c')
         self.board_frame.pack(pady=15)
-        
-        self.cells = []
-        for i in range(9):
-            cell = tk.Button(self.board_frame,
-                           width=4, height=2,
-                           font=('Arial', 24, 'bold'),
-                           bg='#2a3b4c', fg='white',
-                           relief='flat',
-                           command=lambda x=i: self.handle_cell_click(x))
-            cell.grid(row=i//3, column=i%3, padx=4, pady=4)
-            self.cells.append(cell)
+        # كل الخلايا مرسومة على لوحة واحدة، ويعاد رسم الخلايا المتغيرة فقط
+        self.board_view = BoardCanvas(self.board_frame, 300,
+                                      {'background': '#1a2b3c', 'surface': '#2a3b4c'},
+                                      on_click=self.handle_cell_click, font_family='Arial')
+        self.board_view.pack()
+        self.build_cells()
+        
+    def build_cells(self):
+        size = self.game.geometry.size
+        font_size = 24 if self.game.geometry.is_classic else max(8, 72 // size)
+        self.board_view.resize(size, font_size)
             
     def create_control_buttons(self):
         buttons_frame = tk.Frame(self.container, bg='#1a2b3c')
@@ -113,126 +135,104 @@ class TicTacToe:
                                 command=self.start_new_game)
         new_game_btn.pack(side='left', padx=5)
         
+    @instrument.traced('cell_click', 'ui')
     def handle_cell_click(self, index: int):
-        if self.board[index] == '' and not self.game_over and self.current_player == 'X':
+        if self.game.is_legal(index) and self.game.current_player == 'X':
+            self.move_clicked_at = time.perf_counter()
             self.make_move(index)
             
-            if not self.game_over:
-                self.window.after(500, self.make_computer_move)
+            if not self.game.game_over:
+                self.computer_move_job = instrument.after(self.window, 500, self.make_computer_move,
+                                                          'make_computer_move')
                 
     def make_move(self, index: int):
-        self.board[index] = self.current_player
+        winner = self.game.make_move(index)
         self.update_cell(index)
         
-        winner = self.check_winner()
         if winner:
-            self.game_over = True
-            self.scores[winner if winner != 'tie' else 'tie'] += 1
             self.update_score_display()
             self.show_winner_message(winner)
-            return
-            
-        self.current_player = 'O' if self.current_player == 'X' else 'X'
         
+    @instrument.traced('update_cell', 'ui')
     def update_cell(self, index: int):
-        self.cells[index].configure(
-            text=self.board[index],
-            fg='#ff6b6b' if self.board[index] == 'X' else '#ffd93d'
-        )
+        self.board_view.set_mark(index, self.game.board[index],
+                                 '#ff6b6b' if self.game.board[index] == 'X' else '#ffd93d')
         
     def make_computer_move(self):
-        if self.difficulty.get() == 'easy':
-            move = self.make_random_move()
-        elif self.difficulty.get() == 'medium':
-            move = self.make_best_move() if random.random() < 0.5 else self.make_random_move()
-        else:
-            move = self.make_best_move()
-            
-        if move is not None:
-            self.make_move(move)
+        # البحث يجري في الخلفية حتى لا تتجمد الواجهة
+        self.computer_move_job = None
+        if self.game.game_over:
+            return
+        difficulty = self.difficulty.get()
+        if difficulty != self.engine_difficulty:
+            # محرك جديد لكل مستوى صعوبة حتى لا يلعب المستوى المحدود بنتائج بحث أعمق
+            self.engine = self.create_engine()
+            self.engine_difficulty = difficulty
+        board = self.game.board.copy()
+        self.search_worker.submit(
+            lambda stop: self.choose_computer_move(board, difficulty, stop),
+            self.play_computer_move
+        )
+        
+    def choose_computer_move(self, board, difficulty, stop) -> Optional[int]:
+        budget = DIFFICULTY_BUDGETS.get(difficulty.lower(), DIFFICULTY_BUDGETS['hard'])
+        try:
+            return self.engine.think(board, budget.time_ms, budget.max_depth, stop).move
+        except SearchCancelled:
+            return None
             
-    def make_random_move(self) -> Optional[int]:
-        empty_cells = [i for i, cell in enumerate(self.board) if cell == '']
-        return random.choice(empty_cells) if empty_cells else None
-        
-    def make_best_move(self) -> Optional[int]:
-        best_score = float('-inf')
-        best_move = None
-        
-        for i in range(9):
-            if self.board[i] == '':
-                self.board[i] = 'O'
-                score = self.minimax(self.board, 0, False)
-                self.board[i] = ''
-                if score > best_score:
-                    best_score = score
-                    best_move = i
-                    
-        return best_move
-        
-    def minimax(self, board: List[str], depth: int, is_maximizing: bool) -> int:
-        winner = self.check_winner()
-        if winner == 'O':
-            return 1
-        if winner == 'X':
-            return -1
-        if winner == 'tie':
-            return 0
+    def play_computer_move(self, move):
+        if move is None or self.game.game_over:
+            return
+        self.make_move(move)
+        with instrument.span('render', 'ui'):
+            self.window.update_idletasks()
+        if self.move_clicked_at is not None:
+            instrument.counter('move_latency',
+                               ms=(time.perf_counter() - self.move_clicked_at) * 1000)
+            self.move_clicked_at = None
             
-        if is_maximizing:
-            best_score = float('-inf')
-            for i in range(9):
-                if board[i] == '':
-                    board[i] = 'O'
-                    score = self.minimax(board, depth + 1, False)
-                    board[i] = ''
-                    best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float('inf')
-            for i in range(9):
-                if board[i] == '':
-                    board[i] = 'X'
-                    score = self.minimax(board, depth + 1, True)
-                    board[i] = ''
-                    best_score = min(score, best_score)
-            return best_score
+    def cancel_computer_move(self):
+        self.search_worker.cancel()
+        if self.computer_move_job is not None:
+            self.window.after_cancel(self.computer_move_job)
+            self.computer_move_job = None
+        self.move_clicked_at = None
             
     def check_winner(self) -> Optional[str]:
-        win_patterns = [
-            [0, 1, 2], [3, 4, 5], [6, 7, 8],  # أفقي
-            [0, 3, 6], [1, 4, 7], [2, 5, 8],  # عمودي
-            [0, 4, 8], [2, 4, 6]  # قطري
-        ]
-        
-        for pattern in win_patterns:
-            a, b, c = pattern
-            if (self.board[a] and 
-                self.board[a] == self.board[b] and 
-                self.board[a] == self.board[c]):
-                return self.board[a]
-                
-        if '' not in self.board:
-            return 'tie'
-        return None
+        return self.game.check_winner()
         
     def show_winner_message(self, winner: str):
         message = "تعادل!" if winner == 'tie' else f"الفائز هو {winner}!"
         # يمكنك إضافة نافذة منبثقة هنا لعرض الرسالة
         
+    @instrument.traced('update_score_display', 'ui')
     def update_score_display(self):
-        for player, score in self.scores.items():
+        for player, score in self.game.scores.items():
             self.score_labels[player].configure(text=str(score))
             
     def reset_game(self):
-        self.board = [''] * 9
-        self.current_player = 'X'
-        self.game_over = False
-        for cell in self.cells:
-            cell.configure(text='')
+        self.cancel_computer_move()
+        self.game.reset()
+        self.board_view.clear()
             
+    def change_board_size(self):
+        geometry = geometry_from_label(self.board_size.get())
+        if geometry is self.game.geometry:
+            return
+        self.cancel_computer_move()
+        self.game.reset(geometry.size, geometry.win_length)
+        self.engine = self.create_engine()
+        self.build_cells()
+        self.reset_game()
+        
+    def create_engine(self) -> SearchEngine:
+        if self.game.geometry.is_classic:
+            return SearchEngine(tablebase=self.tablebase, shared_cache=self.position_cache)
+        return SearchEngine(mode='alphabeta', shared_cache=self.position_cache)
+        
     def start_new_game(self):
-        self.scores = {'X': 0, 'O': 0, 'tie': 0}
+        self.game.new_match()
         self.update_score_display()
         self.reset_game()
         
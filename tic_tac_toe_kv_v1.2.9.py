@@ -6,16 +6,42 @@ Modern Android-like interface with clear colored buttons, effects, transparency,
 Fixed window size: 600x400 pixels
 """
 
-import tkinter as tk
-from tkinter import ttk, messagebox
-import random
-from typing import List, Optional
 import time
 
+# Launch time, taken before the heavier imports for the startup report
+STARTED_AT = time.perf_counter()
+
+import argparse
+import sys
+import tkinter as tk
+from typing import Optional
+
+from tictactoe import instrument
+from tictactoe.animation import Animator
+from tictactoe.board import geometry_from_label, preset_labels
+from tictactoe.cache import SharedPositionCache
+from tictactoe.canvas import BoardCanvas
+from tictactoe.engine import Analysis, DIFFICULTY_BUDGETS, SearchCancelled, SearchEngine
+from tictactoe.game import Game
+from tictactoe.history import MatchStore
+from tictactoe.record import DEFAULT_PATH as RECORD_PATH, RecordWriter
+from tictactoe.startup import StartupTimer
+from tictactoe.tablebase import Tablebase
+from tictactoe.worker import SearchWorker
+
+# Pixel height available to the board inside the fixed 600x400 window
+BOARD_AREA_PX = 230
+
 class ModernTicTacToe:
-    def __init__(self):
+    def __init__(self, fast_start: bool = True, startup: Optional[StartupTimer] = None):
+        # With fast_start only the header and board are built before the first frame;
+        # the sidebar follows on the first idle pass
+        self.fast_start = fast_start
+        self.panels_ready = False
+        self.startup = startup or StartupTimer(STARTED_AT)
         self.window = tk.Tk()
         self.window.title("Tic Tac Toe v1.2.9 - by almezali")
+        self.startup.mark('window')
         
         # Fixed window size as requested: 600x400
         self.window.geometry("600x400")
@@ -29,11 +55,31 @@ class ModernTicTacToe:
         self.window.geometry(f"600x400+{x}+{y}")
         
         # Game variables
-        self.current_player = 'X'
-        self.board = [''] * 9
+        self.game = Game(recorder=RecordWriter(RECORD_PATH))
+        self.board_size = tk.StringVar(value=self.game.geometry.label())
         self.difficulty = tk.StringVar(value='Medium')
-        self.game_over = False
-        self.scores = {'X': 0, 'O': 0, 'tie': 0}
+        self.tablebase = Tablebase()
+        self.position_cache = SharedPositionCache()
+        self.history = MatchStore()
+        # Engine and its tables are created on the computer's first move
+        self.engine: Optional[SearchEngine] = None
+        self.engine_geometry = None
+        self.engine_difficulty = None
+        self.search_worker = SearchWorker(self.window)
+        self.computer_move_job = None
+        self.animator = Animator(self.window)
+        
+        # Move analysis for the hint button and the evaluation overlay, on its own worker
+        self.show_eval = tk.BooleanVar(value=False)
+        self.analysis_worker = SearchWorker(self.window)
+        self.analysis_engine: Optional[SearchEngine] = None
+        self.analysis_engine_geometry = None
+        self.analysis: Optional[Analysis] = None
+        self.analysis_key = None
+        self.hint_requested = False
+        
+        # Click time of the move awaiting a reply, for the move_latency trace counter
+        self.move_clicked_at = None
         
         # Modern Android-like color scheme with Kvantum-inspired styling
         self.colors = {
@@ -63,6 +109,24 @@ class ModernTicTacToe:
         
         self.setup_ui()
         self.bind_events()
+        self.startup.mark('board')
+        self.window.after_idle(self.on_first_idle)
+        
+    def on_first_idle(self):
+        """The first frame is up: build whatever fast start left out"""
+        self.startup.mark('first_frame')
+        if not self.panels_ready:
+            self.build_panels()
+            
+    def build_panels(self):
+        """Build the sidebar cards and the board size selector"""
+        self.create_sidebar(self.sidebar_frame)
+        self.create_board_size_selector()
+        self.panels_ready = True
+        self.update_current_player_display()
+        self.update_score_display()
+        self.update_history_display()
+        self.startup.mark('panels')
         
     def setup_ui(self):
         """Setup the modern Android-like UI"""
@@ -113,6 +177,23 @@ class ModernTicTacToe:
             bg=self.colors['bg_secondary']
         )
         version_label.pack(side='right', padx=20, pady=15)
+        self.header_frame = header_frame
+        
+    def create_board_size_selector(self):
+        """Board size selector in the header"""
+        from tkinter import ttk
+        
+        self.board_size_combo = ttk.Combobox(
+            self.header_frame,
+            textvariable=self.board_size,
+            values=preset_labels(),
+            state='readonly',
+            style='Kvantum.TCombobox',
+            width=16,
+            font=('Segoe UI', 9)
+        )
+        self.board_size_combo.pack(side='right', pady=15)
+        self.board_size_combo.bind('<<ComboboxSelected>>', lambda e: self.change_board_size())
         
     def create_main_content(self):
         """Create main content area with game board and sidebar"""
@@ -122,22 +203,22 @@ class ModernTicTacToe:
         )
         content_frame.pack(fill='both', expand=True, padx=10, pady=10)
         
-        # Left sidebar for game info
-        self.create_sidebar(content_frame)
+        # Left sidebar for game info, filled in now or after the first frame
+        self.sidebar_frame = tk.Frame(
+            content_frame,
+            bg=self.colors['bg_primary'],
+            width=180
+        )
+        self.sidebar_frame.pack(side='left', fill='y', padx=(0, 10))
+        self.sidebar_frame.pack_propagate(False)
+        if not self.fast_start:
+            self.build_panels()
         
         # Game board in center
         self.create_game_board(content_frame)
         
-    def create_sidebar(self, parent):
+    def create_sidebar(self, sidebar_frame):
         """Create modern sidebar with game information"""
-        sidebar_frame = tk.Frame(
-            parent,
-            bg=self.colors['bg_primary'],
-            width=180
-        )
-        sidebar_frame.pack(side='left', fill='y', padx=(0, 10))
-        sidebar_frame.pack_propagate(False)
-        
         # Current Player Card
         self.create_info_card(
             sidebar_frame, 
@@ -200,6 +281,8 @@ class ModernTicTacToe:
         
     def create_difficulty_card(self, parent, y):
         """Create difficulty selector card with Kvantum styling"""
+        from tkinter import ttk
+        
         # Add Kvantum-style shadow effect
         shadow_frame = tk.Frame(
             parent,
@@ -254,6 +337,7 @@ class ModernTicTacToe:
             font=('Segoe UI', 10)
         )
         self.difficulty_combo.pack(pady=(0, 8))
+        self.difficulty_combo.bind('<<ComboboxSelected>>', lambda e: self.update_history_display())
         
     def create_scoreboard_card(self, parent, y):
         """Create modern scoreboard with Kvantum styling"""
@@ -283,7 +367,17 @@ class ModernTicTacToe:
             fg=self.colors['text_muted'],
             bg=self.colors['bg_card']
         )
-        title_label.pack(pady=(8, 5))
+        title_label.pack(pady=(6, 0))
+        
+        # All-time results for the current board and difficulty
+        self.history_label = tk.Label(
+            card_frame,
+            text="",
+            font=('Segoe UI', 7),
+            fg=self.colors['text_muted'],
+            bg=self.colors['bg_card']
+        )
+        self.history_label.pack(pady=(0, 2))
         
         # Score entries
         self.score_labels = {}
@@ -323,6 +417,8 @@ class ModernTicTacToe:
             
             self.score_labels[key] = score_label
             
+        self.update_history_display()
+        
     def create_sidebar_controls(self, parent, y):
         """Create smaller control buttons side-by-side below scoreboard"""
         # Control buttons container
@@ -400,45 +496,26 @@ class ModernTicTacToe:
         )
         self.board_frame.pack(expand=True, padx=20, pady=20)
         
-        # Create 3x3 grid of modern buttons
-        self.cells = []
-        cell_size = 80
-        
-        for i in range(9):
-            row = i // 3
-            col = i % 3
-            
-            # Create modern button with Material Design styling
-            cell = tk.Button(
-                self.board_frame,
-                text='',
-                width=6,
-                height=3,
-                font=('Segoe UI', 20, 'bold'),
-                bg=self.colors['surface'],
-                fg=self.colors['text_primary'],
-                relief='flat',
-                bd=0,
-                cursor='hand2',
-                activebackground=self.colors['hover'],
-                activeforeground=self.colors['text_primary'],
-                command=lambda x=i: self.handle_cell_click(x)
-            )
-            
-            cell.grid(row=row, column=col, padx=2, pady=2, sticky='nsew')
-            
-            # Configure grid weights for responsive design
-            self.board_frame.grid_rowconfigure(row, weight=1)
-            self.board_frame.grid_columnconfigure(col, weight=1)
-            
-            # Add modern hover effects
-            cell.bind('<Enter>', lambda e, btn=cell: self.on_cell_hover(btn, True))
-            cell.bind('<Leave>', lambda e, btn=cell: self.on_cell_hover(btn, False))
-            
-            self.cells.append(cell)
+        # All cells are drawn on one canvas; only changed cells are redrawn
+        self.board_view = BoardCanvas(
+            self.board_frame,
+            BOARD_AREA_PX,
+            {'background': self.colors['bg_card'], 'surface': self.colors['surface']},
+            on_click=self.handle_cell_click,
+            on_hover=self.on_cell_hover
+        )
+        self.board_view.pack(padx=2, pady=2)
+        self.build_cells()
+        
+    def build_cells(self):
+        """Lay out the canvas cells for the current board size"""
+        # Original 3x3 mark size; larger boards scale marks to their cells
+        self.cell_font_size = 24 if self.game.geometry.is_classic else None
+        self.board_view.resize(self.game.geometry.size, self.cell_font_size)
+        self.cell_font_size = self.board_view.font_size
             
     def create_bottom_controls(self):
-        """Create modern control buttons - only Exit button"""
+        """Create modern control buttons - Hint, Eval and Exit"""
         controls_frame = tk.Frame(
             self.main_frame,
             bg=self.colors['bg_secondary'],
@@ -451,7 +528,45 @@ class ModernTicTacToe:
         button_container = tk.Frame(controls_frame, bg=self.colors['bg_secondary'])
         button_container.pack(expand=True)
         
-        # Only Exit button in bottom controls
+        # Hint and evaluation overlay toggle
+        hint_btn = tk.Button(
+            button_container,
+            text="Hint",
+            font=('Segoe UI', 10, 'bold'),
+            bg=self.colors['accent'],
+            fg=self.colors['bg_primary'],
+            relief='flat',
+            bd=0,
+            padx=20,
+            pady=8,
+            cursor='hand2',
+            activebackground=self.lighten_color(self.colors['accent']),
+            activeforeground=self.colors['bg_primary'],
+            command=self.show_hint
+        )
+        hint_btn.pack(side='left', padx=5, pady=10)
+        hint_btn.bind('<Enter>', lambda e: self.on_button_hover(hint_btn, self.colors['accent'], True))
+        hint_btn.bind('<Leave>', lambda e: self.on_button_hover(hint_btn, self.colors['accent'], False))
+        
+        self.eval_btn = tk.Button(
+            button_container,
+            text="Eval",
+            font=('Segoe UI', 10, 'bold'),
+            bg=self.colors['surface'],
+            fg=self.colors['text_primary'],
+            relief='flat',
+            bd=0,
+            padx=20,
+            pady=8,
+            cursor='hand2',
+            activebackground=self.lighten_color(self.colors['surface']),
+            activeforeground=self.colors['text_primary'],
+            command=self.toggle_eval
+        )
+        self.eval_btn.pack(side='left', padx=5, pady=10)
+        self.eval_btn.bind('<Enter>', lambda e: self.on_button_hover(self.eval_btn, self.eval_button_color(), True))
+        self.eval_btn.bind('<Leave>', lambda e: self.on_button_hover(self.eval_btn, self.eval_button_color(), False))
+        
         exit_btn = tk.Button(
             button_container,
             text="Exit",
@@ -467,7 +582,7 @@ class ModernTicTacToe:
             activeforeground=self.colors['bg_primary'],
             command=self.exit_game
         )
-        exit_btn.pack(pady=10)
+        exit_btn.pack(side='left', padx=5, pady=10)
         
         # Add modern button hover effects
         exit_btn.bind('<Enter>', lambda e: self.on_button_hover(exit_btn, self.colors['error'], True))
@@ -486,27 +601,24 @@ class ModernTicTacToe:
         self.window.bind('<Escape>', lambda e: self.exit_game())
         self.window.bind('<F5>', lambda e: self.reset_game())
         self.window.bind('<F2>', lambda e: self.start_new_game())
+        self.window.bind('<F3>', lambda e: self.show_hint())
+        self.window.bind('<F4>', lambda e: self.toggle_eval())
+        # Closing the window must also close the match history and game record
+        self.window.protocol('WM_DELETE_WINDOW', self.exit_game)
         
-    def on_cell_hover(self, button, entering):
+    def on_cell_hover(self, index, entering):
         """Handle modern cell hover effects"""
-        cell_index = self.cells.index(button)
-        if self.board[cell_index] == '' and not self.game_over:
+        if self.game.board[index] == '' and not self.game.game_over:
             if entering:
-                button.configure(
-                    bg=self.colors['hover'],
-                    relief='raised'
-                )
+                self.board_view.set_fill(index, self.colors['hover'])
                 # Show preview of current player's symbol only on hover
-                preview_color = self.colors['primary'] if self.current_player == 'X' else self.colors['secondary']
-                preview_symbol = '✗' if self.current_player == 'X' else '◯'
-                button.configure(text=preview_symbol, fg=preview_color)
+                preview_color = self.colors['primary'] if self.game.current_player == 'X' else self.colors['secondary']
+                preview_symbol = '✗' if self.game.current_player == 'X' else '◯'
+                self.board_view.set_mark(index, preview_symbol, preview_color)
             else:
-                button.configure(
-                    bg=self.colors['surface'],
-                    relief='flat'
-                )
+                self.board_view.set_fill(index, None)
                 # Clear preview when not hovering and cell is empty
-                button.configure(text="", fg=self.colors['text_primary'])
+                self.board_view.set_mark(index, '')
                     
     def on_button_hover(self, button, original_color, entering):
         """Handle modern button hover effects"""
@@ -515,232 +627,179 @@ class ModernTicTacToe:
         else:
             button.configure(bg=original_color)
             
+    @instrument.traced('cell_click', 'ui')
     def handle_cell_click(self, index: int):
         """Handle cell click with modern animations"""
-        if self.board[index] == '' and not self.game_over and self.current_player == 'X':
+        if self.game.is_legal(index) and self.game.current_player == 'X':
+            self.move_clicked_at = time.perf_counter()
+            self.game.difficulty = self.difficulty.get()
             self.animate_cell_click(index)
             self.make_move(index)
             
-            if not self.game_over:
-                self.window.after(500, self.make_computer_move)
+            if not self.game.game_over:
+                self.computer_move_job = instrument.after(self.window, 500, self.make_computer_move,
+                                                          'make_computer_move')
                 
     def animate_cell_click(self, index: int):
         """Create modern click animation"""
-        cell = self.cells[index]
-        
         # Modern pulse effect
-        original_bg = cell['bg']
-        pulse_color = self.colors['primary'] if self.current_player == 'X' else self.colors['secondary']
+        pulse_color = self.colors['primary'] if self.game.current_player == 'X' else self.colors['secondary']
         
-        cell.configure(bg=pulse_color)
-        self.window.after(100, lambda: cell.configure(bg=original_bg))
+        self.animator.play(('cell', index), [
+            (0, lambda: self.board_view.set_fill(index, pulse_color)),
+            (100, lambda: self.board_view.set_fill(index, None))
+        ], final=lambda: self.board_view.set_fill(index, None))
         
     def make_move(self, index: int):
         """Make a move and update the board"""
-        self.board[index] = self.current_player
+        winner = self.game.make_move(index)
         self.update_cell(index)
         
-        winner = self.check_winner()
         if winner:
-            self.game_over = True
-            self.scores[winner if winner != 'tie' else 'tie'] += 1
+            self.history.record(winner, self.difficulty.get(), self.game.geometry.label(),
+                                self.game.moves)
             self.update_score_display()
+            self.update_history_display()
             self.animate_winner(winner)
-            self.window.after(1000, lambda: self.show_winner_message(winner))
+            self.animator.play('winner_message', [(1000, lambda: self.show_winner_message(winner))])
+            self.refresh_analysis()
             return
             
-        self.current_player = 'O' if self.current_player == 'X' else 'X'
         self.update_current_player_display()
+        self.refresh_analysis()
         
+    @instrument.traced('update_cell', 'ui')
     def update_cell(self, index: int):
         """Update cell with modern styling and futuristic symbols"""
-        cell = self.cells[index]
-        player = self.board[index]
+        player = self.game.board[index]
         
         if player == 'X':
-            cell.configure(
-                text='✗',
-                fg=self.colors['primary'],
-                font=('Segoe UI', 24, 'bold'),
-                bg=self.colors['surface']
-            )
+            self.board_view.set_mark(index, '✗', self.colors['primary'])
         elif player == 'O':
-            cell.configure(
-                text='◯',
-                fg=self.colors['secondary'],
-                font=('Segoe UI', 24, 'bold'),
-                bg=self.colors['surface']
-            )
+            self.board_view.set_mark(index, '◯', self.colors['secondary'])
             
         # Modern scale animation
-        self.scale_cell(cell)
+        self.scale_cell(index)
         
-    def scale_cell(self, cell):
+    def scale_cell(self, index):
         """Create modern scale animation"""
-        original_font = cell['font']
-        
-        def animate_scale(step=0):
-            if step < 4:
-                size = 24 + (step % 2) * 2
-                cell.configure(font=('Segoe UI', size, 'bold'))
-                self.window.after(50, lambda: animate_scale(step + 1))
-            else:
-                cell.configure(font=original_font)
-                
-        animate_scale()
+        def grow(points):
+            return lambda: self.board_view.set_grow(index, points)
+            
+        self.animator.play(('scale', index),
+                           [(step * 50, grow((step % 2) * 2)) for step in range(5)],
+                           final=grow(0))
         
+    @instrument.traced('update_player_display', 'ui')
     def update_current_player_display(self):
         """Update current player with modern colors and futuristic symbols"""
-        color = self.colors['primary'] if self.current_player == 'X' else self.colors['secondary']
-        symbol = '✗' if self.current_player == 'X' else '◯'
+        if not self.panels_ready:
+            return
+        color = self.colors['primary'] if self.game.current_player == 'X' else self.colors['secondary']
+        symbol = '✗' if self.game.current_player == 'X' else '◯'
         self.current_player_label.configure(
             text=symbol,
             fg=color
         )
         
     def make_computer_move(self):
-        """Make computer move with modern thinking animation"""
-        if self.game_over:
+        """Start the computer's search in the background with a thinking animation"""
+        self.computer_move_job = None
+        if self.game.game_over:
             return
             
         # Show modern thinking animation
         self.animate_computer_thinking()
         
         difficulty = self.difficulty.get().lower()
+        board = self.game.board.copy()
+        self.get_engine(difficulty)
+        started = time.perf_counter()
+        self.search_worker.submit(
+            lambda stop: self.choose_computer_move(board, difficulty, stop),
+            lambda move: self.on_computer_move_ready(move, started)
+        )
         
-        if difficulty == 'easy':
-            move = self.make_random_move()
-        elif difficulty == 'medium':
-            move = self.make_best_move() if random.random() < 0.7 else self.make_random_move()
-        else:  # hard
-            move = self.make_best_move()
+    def choose_computer_move(self, board, difficulty, stop) -> Optional[int]:
+        """Pick the computer's move within the difficulty's budget (runs on the search worker thread)"""
+        budget = DIFFICULTY_BUDGETS.get(difficulty.lower(), DIFFICULTY_BUDGETS['hard'])
+        try:
+            return self.engine.think(board, budget.time_ms, budget.max_depth, stop).move
+        except SearchCancelled:
+            return None
             
-        if move is not None:
-            self.window.after(800, lambda: self.make_move(move))
+    def on_computer_move_ready(self, move, started):
+        """Play the searched move once the thinking animation has had its moment"""
+        if move is None or self.game.game_over:
+            return
+        elapsed = int((time.perf_counter() - started) * 1000)
+        self.computer_move_job = instrument.after(
+            self.window, max(0, 800 - elapsed),
+            lambda: self.play_computer_move(move), 'play_computer_move'
+        )
+        
+    def play_computer_move(self, move):
+        """Render the computer's move and record click-to-render latency"""
+        self.computer_move_job = None
+        self.animator.cancel('thinking', restore=False)
+        self.make_move(move)
+        with instrument.span('render', 'ui'):
+            self.window.update_idletasks()
+        if self.move_clicked_at is not None:
+            instrument.counter('move_latency',
+                               ms=(time.perf_counter() - self.move_clicked_at) * 1000)
+            self.move_clicked_at = None
             
+    def cancel_computer_move(self):
+        """Drop any pending or in-flight computer move"""
+        self.search_worker.cancel()
+        if self.computer_move_job is not None:
+            self.window.after_cancel(self.computer_move_job)
+            self.computer_move_job = None
+        self.move_clicked_at = None
+        
     def animate_computer_thinking(self):
         """Show modern thinking animation"""
+        if not self.panels_ready:
+            return
         thinking_symbols = ["●", "●●", "●●●"]
         
-        def cycle_thinking(step=0):
-            if step < len(thinking_symbols) * 2:
-                symbol = thinking_symbols[step % len(thinking_symbols)]
-                self.current_player_label.configure(text=symbol, fg=self.colors['text_muted'])
-                self.window.after(200, lambda: cycle_thinking(step + 1))
-            else:
-                self.current_player_label.configure(text="◯", fg=self.colors['secondary'])
-                
-        cycle_thinking()
-        
-    def make_random_move(self) -> Optional[int]:
-        """Make a random move"""
-        empty_cells = [i for i, cell in enumerate(self.board) if cell == '']
-        return random.choice(empty_cells) if empty_cells else None
-        
-    def make_best_move(self) -> Optional[int]:
-        """Make the best possible move using minimax"""
-        best_score = float('-inf')
-        best_move = None
-        
-        for i in range(9):
-            if self.board[i] == '':
-                self.board[i] = 'O'
-                score = self.minimax(self.board, 0, False)
-                self.board[i] = ''
-                if score > best_score:
-                    best_score = score
-                    best_move = i
-                    
-        return best_move
-        
-    def minimax(self, board: List[str], depth: int, is_maximizing: bool) -> int:
-        """Minimax algorithm for AI"""
-        winner = self.check_winner()
-        if winner == 'O':
-            return 1
-        if winner == 'X':
-            return -1
-        if winner == 'tie':
-            return 0
-            
-        if is_maximizing:
-            best_score = float('-inf')
-            for i in range(9):
-                if board[i] == '':
-                    board[i] = 'O'
-                    score = self.minimax(board, depth + 1, False)
-                    board[i] = ''
-                    best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float('inf')
-            for i in range(9):
-                if board[i] == '':
-                    board[i] = 'X'
-                    score = self.minimax(board, depth + 1, True)
-                    board[i] = ''
-                    best_score = min(score, best_score)
-            return best_score
+        def show(symbol, color):
+            return lambda: self.current_player_label.configure(text=symbol, fg=color)
             
+        steps = len(thinking_symbols) * 2
+        keyframes = [(step * 200, show(thinking_symbols[step % len(thinking_symbols)], self.colors['text_muted']))
+                     for step in range(steps)]
+        keyframes.append((steps * 200, show("◯", self.colors['secondary'])))
+        self.animator.play('thinking', keyframes, final=self.update_current_player_display)
+        
     def check_winner(self) -> Optional[str]:
         """Check for winner"""
-        win_patterns = [
-            [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Horizontal
-            [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Vertical
-            [0, 4, 8], [2, 4, 6]              # Diagonal
-        ]
-        
-        for pattern in win_patterns:
-            a, b, c = pattern
-            if (self.board[a] and 
-                self.board[a] == self.board[b] and 
-                self.board[a] == self.board[c]):
-                return self.board[a]
-                
-        if '' not in self.board:
-            return 'tie'
-        return None
+        return self.game.check_winner()
         
+    @instrument.traced('animate_winner', 'ui')
     def animate_winner(self, winner: str):
         """Create modern winner animation"""
         if winner == 'tie':
             # Modern tie animation - pulse all cells
-            for cell in self.cells:
-                self.pulse_cell_modern(cell, self.colors['warning'])
+            for index in range(self.game.geometry.cells):
+                self.pulse_cell_modern(index, self.colors['warning'])
             return
             
         # Find winning pattern and highlight
-        win_patterns = [
-            [0, 1, 2], [3, 4, 5], [6, 7, 8],
-            [0, 3, 6], [1, 4, 7], [2, 5, 8],
-            [0, 4, 8], [2, 4, 6]
-        ]
-        
-        for pattern in win_patterns:
-            a, b, c = pattern
-            if (self.board[a] == winner and 
-                self.board[b] == winner and 
-                self.board[c] == winner):
-                color = self.colors['primary'] if winner == 'X' else self.colors['secondary']
-                for index in pattern:
-                    self.pulse_cell_modern(self.cells[index], color)
-                break
+        pattern = self.game.board.winning_line()
+        if pattern is not None:
+            color = self.colors['primary'] if winner == 'X' else self.colors['secondary']
+            for index in pattern:
+                self.pulse_cell_modern(index, color)
                 
-    def pulse_cell_modern(self, cell, color):
+    def pulse_cell_modern(self, index, color):
         """Create modern pulse animation"""
-        original_bg = cell['bg']
-        
-        def pulse(step=0):
-            if step < 6:
-                if step % 2 == 0:
-                    cell.configure(bg=color, relief='raised')
-                else:
-                    cell.configure(bg=original_bg, relief='flat')
-                self.window.after(150, lambda: pulse(step + 1))
-            else:
-                cell.configure(bg=original_bg, relief='flat')
-                
-        pulse()
+        def fill(step):
+            return lambda: self.board_view.set_fill(index, color if step % 2 == 0 and step < 6 else None)
+            
+        self.animator.play(('cell', index), [(step * 150, fill(step)) for step in range(7)],
+                           final=lambda: self.board_view.set_fill(index, None))
         
     def show_winner_message(self, winner: str):
         """Show modern winner message"""
@@ -809,57 +868,192 @@ class ModernTicTacToe:
         )
         ok_button.pack()
         
+    @instrument.traced('update_score_display', 'ui')
     def update_score_display(self):
         """Update score display with modern animation"""
-        for player, score in self.scores.items():
+        if not self.panels_ready:
+            return
+        for player, score in self.game.scores.items():
             label = self.score_labels[player]
+            if label['text'] == str(score):
+                continue
             label.configure(text=str(score))
             
             # Modern pulse effect for updated score
-            self.pulse_score_modern(label)
+            self.pulse_score_modern(player)
             
-    def pulse_score_modern(self, label):
+    def update_history_display(self):
+        """Show all-time results for the current board and difficulty"""
+        if not self.panels_ready:
+            return
+        stats = self.history.stats(self.game.geometry.label(), self.difficulty.get())
+        if stats.games:
+            text = f"All-time: {stats.games} games, X won {stats.x_win_rate:.0%}"
+        else:
+            text = "All-time: no games yet"
+        self.history_label.configure(text=text)
+        
+    def pulse_score_modern(self, player):
         """Create modern pulse effect for score update"""
-        original_font = label['font']
+        label = self.score_labels[player]
         
-        def pulse(step=0):
-            if step < 4:
-                size = 10 + (step % 2) * 2
-                label.configure(font=('Segoe UI', size, 'bold'))
-                self.window.after(100, lambda: pulse(step + 1))
-            else:
-                label.configure(font=original_font)
-                
-        pulse()
+        def font(size):
+            return lambda: label.configure(font=('Segoe UI', size, 'bold'))
+            
+        self.animator.play(('score', player),
+                           [(step * 100, font(10 + (step % 2) * 2)) for step in range(5)],
+                           final=font(10))
         
     def reset_game(self):
         """Reset current game with modern transition"""
+        # Drop animations of the old round, leaving widgets at rest
+        self.animator.cancel()
+        
         # Modern flash effect
-        self.window.configure(bg=self.colors['primary'])
-        self.window.after(50, lambda: self.window.configure(bg=self.colors['bg_primary']))
-        
-        self.board = [''] * 9
-        self.current_player = 'X'
-        self.game_over = False
-        
-        for cell in self.cells:
-            cell.configure(
-                text="",
-                bg=self.colors['surface'],
-                fg=self.colors['text_primary'],
-                relief='flat'
-            )
+        def window_bg(color):
+            return lambda: self.window.configure(bg=color)
+            
+        self.animator.play('flash', [(0, window_bg(self.colors['primary'])),
+                                     (50, window_bg(self.colors['bg_primary']))],
+                           final=window_bg(self.colors['bg_primary']))
+        
+        self.cancel_computer_move()
+        self.game.reset()
+        
+        self.board_view.clear()
             
         self.update_current_player_display()
+        self.refresh_analysis()
+        
+    def change_board_size(self):
+        """Switch to the selected board size and start a fresh round"""
+        geometry = geometry_from_label(self.board_size.get())
+        if geometry is self.game.geometry:
+            return
+        self.cancel_computer_move()
+        self.animator.cancel()
+        self.game.reset(geometry.size, geometry.win_length)
+        self.build_cells()
+        self.reset_game()
+        self.update_history_display()
+        
+    def get_engine(self, difficulty: str) -> SearchEngine:
+        """Engine for the current board and difficulty, created on first use"""
+        # A fresh engine per difficulty, so a depth-limited level never plays from
+        # entries a deeper level left in the table
+        if (self.engine is None or self.engine_geometry is not self.game.geometry
+                or self.engine_difficulty != difficulty):
+            self.engine = self.create_engine()
+            self.engine_geometry = self.game.geometry
+            self.engine_difficulty = difficulty
+        return self.engine
+        
+    def create_engine(self) -> SearchEngine:
+        """Search engine suited to the current board size"""
+        if self.game.geometry.is_classic:
+            return SearchEngine(tablebase=self.tablebase, shared_cache=self.position_cache)
+        return SearchEngine(mode='alphabeta', shared_cache=self.position_cache)
+        
+    def get_analysis_engine(self) -> SearchEngine:
+        """Engine used for hints and the evaluation overlay"""
+        if self.analysis_engine is None or self.analysis_engine_geometry is not self.game.geometry:
+            self.analysis_engine = SearchEngine(mode='alphabeta')
+            self.analysis_engine_geometry = self.game.geometry
+        return self.analysis_engine
+        
+    def position_key(self):
+        board = self.game.board
+        return (self.game.geometry, board.x_mask, board.o_mask)
+        
+    def refresh_analysis(self):
+        """Drop the old overlay and analyse the new position when it is the player's turn"""
+        self.board_view.clear_notes()
+        if self.game.game_over or self.game.current_player != 'X':
+            self.analysis_worker.cancel()
+            self.hint_requested = False
+            return
+        if self.analysis_key == self.position_key():
+            self.show_eval_notes()
+        elif self.show_eval.get() or self.hint_requested:
+            self.start_analysis()
+            
+    def start_analysis(self):
+        """Analyse every move of the current position in the background"""
+        key = self.position_key()
+        board = self.game.board.copy()
+        engine = self.get_analysis_engine()
+        
+        def analyze(stop):
+            try:
+                return engine.analyze(board, stop)
+            except SearchCancelled:
+                return None
+                
+        self.analysis_worker.submit(analyze, lambda analysis: self.on_analysis_ready(key, analysis))
+        
+    def on_analysis_ready(self, key, analysis: Optional[Analysis]):
+        """Keep the analysis and show whatever was waiting for it"""
+        if analysis is None or key != self.position_key():
+            return
+        self.analysis = analysis
+        self.analysis_key = key
+        self.show_eval_notes()
+        if self.hint_requested:
+            self.hint_requested = False
+            self.show_hint()
+            
+    def show_eval_notes(self):
+        """Write each move's evaluation into its cell: W/L with plies to the end, D, or a score"""
+        if not self.show_eval.get() or self.analysis_key != self.position_key():
+            return
+        for move in self.analysis.moves:
+            if move.exact and move.value > 0:
+                text, color = f"W{move.distance}", self.colors['accent']
+            elif move.exact and move.value < 0:
+                text, color = f"L{move.distance}", self.colors['error']
+            elif move.exact:
+                text, color = "D", self.colors['text_muted']
+            else:
+                text, color = f"{move.value:+.2f}", self.colors['text_secondary']
+            self.board_view.set_note(move.move, text, color)
+            
+    def show_hint(self):
+        """Pulse the best move for the player, analysing the position first if needed"""
+        if self.game.game_over or self.game.current_player != 'X':
+            return
+        if self.analysis_key != self.position_key():
+            self.hint_requested = True
+            if not self.analysis_worker.busy():
+                self.start_analysis()
+            return
+        best = self.analysis.best
+        if best is not None:
+            self.pulse_cell_modern(best.move, self.colors['accent'])
+            
+    def toggle_eval(self):
+        """Switch the evaluation overlay on or off"""
+        self.show_eval.set(not self.show_eval.get())
+        self.eval_btn.configure(bg=self.eval_button_color())
+        if self.show_eval.get():
+            self.refresh_analysis()
+        else:
+            self.board_view.clear_notes()
+            
+    def eval_button_color(self) -> str:
+        return self.colors['primary'] if self.show_eval.get() else self.colors['surface']
         
     def start_new_game(self):
         """Start completely new game"""
-        self.scores = {'X': 0, 'O': 0, 'tie': 0}
+        self.game.new_match()
         self.update_score_display()
         self.reset_game()
         
     def exit_game(self):
         """Exit the game"""
+        self.search_worker.shutdown()
+        self.analysis_worker.shutdown()
+        self.history.close()
+        self.game.recorder.close()
         self.window.quit()
         
     def run(self):
@@ -868,12 +1062,33 @@ class ModernTicTacToe:
 
 def main():
     """Main function to run the modern game"""
+    parser = argparse.ArgumentParser(description="Tic Tac Toe v1.2.9")
+    parser.add_argument('--no-fast-start', action='store_true',
+                        help="Build every panel before showing the window")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="Print startup milestones against the first-frame target")
+    parser.add_argument('--quit-after-startup', action='store_true',
+                        help="Exit once started; the exit status is 1 if the target was missed")
+    args = parser.parse_args()
+    
     try:
-        game = ModernTicTacToe()
+        game = ModernTicTacToe(fast_start=not args.no_fast_start)
+        
+        def startup_done():
+            if args.startup_report or args.quit_after_startup:
+                print(game.startup.format_report())
+            if args.quit_after_startup:
+                game.exit_game()
+                
+        # Queued behind the game's own first-idle work, so every panel is built by then
+        game.window.after_idle(startup_done)
         game.run()
+        if args.quit_after_startup and not game.startup.report()['met']:
+            sys.exit(1)
     except Exception as e:
         print(f"Error starting game: {e}")
         try:
+            from tkinter import messagebox
             messagebox.showerror("Error", f"Failed to start game: {e}")
         except:
             print("Could not show error dialog")
@@ -0,0 +1,11 @@
+"""
+Tic Tac Toe game engine
+Shared, display-free logic used by both Tkinter front ends
+"""
+
+from .board import Board, Position
+from .engine import EnginePool, SearchEngine, SearchResult, TranspositionTable
+from .mcts import MCTSEngine
+
+__all__ = ['Board', 'EnginePool', 'MCTSEngine', 'Position', 'SearchEngine', 'SearchResult',
+           'TranspositionTable']
@@ -0,0 +1,136 @@
+"""
+Frame-driven animation scheduler for the Tk front ends
+Every animation is a list of keyframes (offset in ms, action) registered under a key.
+One after() timer ticks once per frame and runs all keyframes that are due, so widget
+updates are batched per frame. Starting an animation under a key that is already
+playing replaces it, and cancel() drops animations outright, e.g. on reset.
+"""
+
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, Optional, Sequence, Tuple
+
+from . import instrument
+
+Action = Callable[[], None]
+
+# 60 frames per second
+FRAME_MS = 16
+
+
+class Animation:
+    """Keyframes still to run and the action that restores the resting state"""
+
+    __slots__ = ('frames', 'final')
+
+    def __init__(self, frames: Deque[Tuple[float, Action]], final: Optional[Action]):
+        self.frames = frames
+        self.final = final
+
+
+class Animator:
+    """Runs keyed animations from a single per-frame tick on a Tk widget"""
+
+    def __init__(self, widget, frame_ms: int = FRAME_MS):
+        self.widget = widget
+        self.frame_ms = frame_ms
+        self.animations: Dict[Hashable, Animation] = {}
+        self.tick_job = None
+        self.next_tick = 0.0
+        self.frames = 0
+        self.frame_time_total = 0.0
+        self.frame_time_max = 0.0
+        self.lateness_max = 0.0
+        self.replaced = 0
+        self.cancelled = 0
+
+    def play(self, key: Hashable, keyframes: Sequence[Tuple[int, Action]],
+             final: Optional[Action] = None):
+        """Start an animation; keyframes are (ms from now, action) in time order
+
+        An animation already playing under key is replaced; its final action runs first
+        so the widget starts from its resting state. final also runs when this one is
+        cancelled, but not when it finishes (the last keyframe should restore it).
+        """
+        previous = self.animations.pop(key, None)
+        if previous is not None:
+            self.replaced += 1
+            if previous.final is not None:
+                previous.final()
+        now = time.perf_counter()
+        frames = deque((now + offset / 1000.0, action) for offset, action in keyframes)
+        animation = Animation(frames, final)
+        # Frames due now run at once, so a click shows up in the same event
+        self.run_due(animation, now)
+        if animation.frames:
+            self.animations[key] = animation
+            self.schedule()
+
+    def playing(self, key: Hashable) -> bool:
+        return key in self.animations
+
+    def cancel(self, key: Optional[Hashable] = None, restore: bool = True):
+        """Stop one animation, or all of them with no key; restore runs final actions"""
+        keys = list(self.animations) if key is None else [key]
+        for name in keys:
+            animation = self.animations.pop(name, None)
+            if animation is None:
+                continue
+            self.cancelled += 1
+            if restore and animation.final is not None:
+                animation.final()
+        if not self.animations and self.tick_job is not None:
+            self.widget.after_cancel(self.tick_job)
+            self.tick_job = None
+
+    def schedule(self):
+        """Make sure a tick is pending"""
+        if self.tick_job is None:
+            self.next_tick = time.perf_counter() + self.frame_ms / 1000.0
+            self.tick_job = self.widget.after(self.frame_ms, self.tick)
+
+    @staticmethod
+    def run_due(animation: Animation, now: float):
+        frames = animation.frames
+        while frames and frames[0][0] <= now:
+            frames.popleft()[1]()
+
+    def tick(self):
+        """Run every keyframe that is due, then wait for the next frame"""
+        self.tick_job = None
+        started = time.perf_counter()
+        self.lateness_max = max(self.lateness_max, started - self.next_tick)
+        with instrument.span('animation_frame', 'ui', animations=len(self.animations)):
+            for key, animation in list(self.animations.items()):
+                # An earlier action may have cancelled or replaced this one
+                if self.animations.get(key) is not animation:
+                    continue
+                self.run_due(animation, started)
+                if not animation.frames and self.animations.get(key) is animation:
+                    del self.animations[key]
+        elapsed = time.perf_counter() - started
+        self.frames += 1
+        self.frame_time_total += elapsed
+        self.frame_time_max = max(self.frame_time_max, elapsed)
+        if instrument.enabled():
+            instrument.counter('animation', queued_frames=self.queue_depth(),
+                               frame_ms=elapsed * 1000)
+        if self.animations:
+            self.schedule()
+
+    def queue_depth(self) -> int:
+        """Keyframes waiting to run"""
+        return sum(len(animation.frames) for animation in self.animations.values())
+
+    def stats(self) -> Dict[str, float]:
+        """Queue depth and frame timings since start"""
+        return {
+            'animations': len(self.animations),
+            'queued_frames': self.queue_depth(),
+            'frames': self.frames,
+            'frame_ms_mean': round(self.frame_time_total / self.frames * 1000, 3) if self.frames else 0.0,
+            'frame_ms_max': round(self.frame_time_max * 1000, 3),
+            'late_ms_max': round(self.lateness_max * 1000, 3),
+            'replaced': self.replaced,
+            'cancelled': self.cancelled
+        }
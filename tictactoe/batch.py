@@ -0,0 +1,142 @@
+"""
+Vectorized batch evaluation with NumPy
+Winner / terminal status, legal moves and successor positions for whole arrays of boards
+at once, using the same line masks as Board.winner(). Requires NumPy.
+
+Positions are passed as two uint64 arrays of X and O bitmasks (boards up to 8x8).
+"""
+
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from .board import Board, Geometry, geometry_for
+
+# Values returned by status()
+ONGOING = 0
+X_WINS = 1
+O_WINS = 2
+TIE = 3
+
+# Masks are stored in uint64, so larger boards cannot be batched
+MAX_BATCH_CELLS = 64
+
+
+@lru_cache(maxsize=None)
+def _line_masks(geometry: Geometry) -> Tuple[np.uint64, ...]:
+    if geometry.cells > MAX_BATCH_CELLS:
+        raise ValueError(f"Batch evaluation supports at most {MAX_BATCH_CELLS} cells")
+    return tuple(np.uint64(mask) for mask in geometry.line_masks)
+
+
+@lru_cache(maxsize=None)
+def _cell_bits(geometry: Geometry) -> np.ndarray:
+    return np.left_shift(np.uint64(1), np.arange(geometry.cells, dtype=np.uint64))
+
+
+def _geometry(geometry: Optional[Geometry]) -> Geometry:
+    return geometry if geometry is not None else geometry_for(3)
+
+
+def masks_from_boards(boards: Iterable[Board]) -> Tuple[np.ndarray, np.ndarray]:
+    """X and O mask arrays for a sequence of Boards"""
+    pairs = [(board.x_mask, board.o_mask) for board in boards]
+    array = np.array(pairs, dtype=np.uint64).reshape(-1, 2)
+    return array[:, 0].copy(), array[:, 1].copy()
+
+
+def masks_from_cells(cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """X and O mask arrays for an (N, cells) array with 0 empty, 1 X and 2 O"""
+    cells = np.asarray(cells)
+    if cells.shape[1] > MAX_BATCH_CELLS:
+        raise ValueError(f"Batch evaluation supports at most {MAX_BATCH_CELLS} cells")
+    bits = np.left_shift(np.uint64(1), np.arange(cells.shape[1], dtype=np.uint64))
+    x_mask = np.bitwise_or.reduce(np.where(cells == 1, bits, np.uint64(0)), axis=1)
+    o_mask = np.bitwise_or.reduce(np.where(cells == 2, bits, np.uint64(0)), axis=1)
+    return x_mask, o_mask
+
+
+def cells_from_masks(x_mask: np.ndarray, o_mask: np.ndarray,
+                     geometry: Optional[Geometry] = None) -> np.ndarray:
+    """(N, cells) int8 array with 0 empty, 1 X and 2 O"""
+    bits = _cell_bits(_geometry(geometry))
+    x_cells = (np.asarray(x_mask, dtype=np.uint64)[:, None] & bits) != 0
+    o_cells = (np.asarray(o_mask, dtype=np.uint64)[:, None] & bits) != 0
+    return x_cells.astype(np.int8) + 2 * o_cells.astype(np.int8)
+
+
+def popcount(mask: np.ndarray) -> np.ndarray:
+    """Number of set bits of every mask"""
+    mask = np.asarray(mask, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(mask).astype(np.int64)
+    counts = np.zeros(mask.shape, dtype=np.int64)
+    for bit in _cell_bits(geometry_for(8)):
+        counts += (mask & bit) != 0
+    return counts
+
+
+def x_to_move(x_mask: np.ndarray, o_mask: np.ndarray) -> np.ndarray:
+    """True where X moves next (equal piece counts)"""
+    return popcount(x_mask) == popcount(o_mask)
+
+
+def status(x_mask: np.ndarray, o_mask: np.ndarray,
+           geometry: Optional[Geometry] = None) -> np.ndarray:
+    """ONGOING, X_WINS, O_WINS or TIE for every position, as int8"""
+    geometry = _geometry(geometry)
+    x_mask = np.asarray(x_mask, dtype=np.uint64)
+    o_mask = np.asarray(o_mask, dtype=np.uint64)
+    result = np.full(x_mask.shape, ONGOING, dtype=np.int8)
+    result[(x_mask | o_mask) == np.uint64(geometry.full_mask)] = TIE
+    # Like Geometry.winner, the first completed line in line order decides
+    decided = np.zeros(x_mask.shape, dtype=bool)
+    for line in _line_masks(geometry):
+        x_line = (x_mask & line) == line
+        o_line = (o_mask & line) == line
+        result[x_line & ~decided] = X_WINS
+        result[o_line & ~x_line & ~decided] = O_WINS
+        decided |= x_line | o_line
+    return result
+
+
+def legal_move_masks(x_mask: np.ndarray, o_mask: np.ndarray,
+                     geometry: Optional[Geometry] = None,
+                     results: Optional[np.ndarray] = None) -> np.ndarray:
+    """Bitmask of the playable cells; zero once the game is over"""
+    geometry = _geometry(geometry)
+    if results is None:
+        results = status(x_mask, o_mask, geometry)
+    empty = np.uint64(geometry.full_mask) & ~(np.asarray(x_mask, dtype=np.uint64)
+                                              | np.asarray(o_mask, dtype=np.uint64))
+    return np.where(results == ONGOING, empty, np.uint64(0))
+
+
+def legal_moves(x_mask: np.ndarray, o_mask: np.ndarray,
+                geometry: Optional[Geometry] = None,
+                results: Optional[np.ndarray] = None) -> np.ndarray:
+    """(N, cells) boolean array of the playable cells"""
+    geometry = _geometry(geometry)
+    moves = legal_move_masks(x_mask, o_mask, geometry, results)
+    return (moves[:, None] & _cell_bits(geometry)) != 0
+
+
+def successors(x_mask: np.ndarray, o_mask: np.ndarray,
+               geometry: Optional[Geometry] = None,
+               results: Optional[np.ndarray] = None
+               ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Child positions for every cell: (child_x, child_o, legal), each (N, cells)
+
+    Row i, column c is position i after the side to move plays cell c; entries
+    where legal is False repeat the parent and should be ignored.
+    """
+    geometry = _geometry(geometry)
+    x_mask = np.asarray(x_mask, dtype=np.uint64)
+    o_mask = np.asarray(o_mask, dtype=np.uint64)
+    legal = legal_moves(x_mask, o_mask, geometry, results)
+    placed = np.where(legal, _cell_bits(geometry), np.uint64(0))
+    x_turn = x_to_move(x_mask, o_mask)[:, None]
+    child_x = x_mask[:, None] | np.where(x_turn, placed, np.uint64(0))
+    child_o = o_mask[:, None] | np.where(x_turn, np.uint64(0), placed)
+    return child_x, child_o, legal
@@ -0,0 +1,342 @@
+"""
+Engine benchmark suite
+Times the search engines on a fixed set of positions for every difficulty, plus the
+winner check, and writes JSON so runs from different versions can be compared. No Tk.
+
+Run with:
+    python -m tictactoe.bench [--repeat 5] [--output bench.json] [--baseline old.json]
+
+--check-cache instead checks that moves served from the shared position cache match
+fresh searches.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from .board import Board, Position, side_to_move
+from .cache import SharedPositionCache
+from .engine import DIFFICULTY_BUDGETS, SearchEngine
+from .mcts import DIFFICULTY_PLAYOUTS, MCTSEngine
+from .symmetry import symmetry_for
+from .tablebase import Tablebase
+
+# Bump when positions or measurement change, so old results are not compared blindly
+BENCH_VERSION = 1
+
+# Relative change in median latency reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+# Cases faster than this are timer noise and are left out of comparisons
+MIN_COMPARABLE_MS = 0.5
+
+ENGINE_NAMES = ('minimax', 'alphabeta', 'tablebase', 'mcts')
+
+
+class BenchPosition(NamedTuple):
+    """A named position to search, given as cell strings"""
+    name: str
+    cells: Sequence[str]
+    size: int = 3
+    win_length: Optional[int] = None
+
+    def board(self) -> Board:
+        """Fresh Board for this position"""
+        return Board(self.cells, self.size, self.win_length)
+
+
+def cells_from_moves(moves: Sequence[int], size: int = 3) -> List[str]:
+    """Cell strings after playing moves alternately, X first"""
+    cells = [''] * (size * size)
+    for ply, move in enumerate(moves):
+        cells[move] = 'X' if ply % 2 == 0 else 'O'
+    return cells
+
+
+POSITIONS = (
+    BenchPosition('3x3 empty', cells_from_moves([])),
+    BenchPosition('3x3 midgame', cells_from_moves([0, 4, 8])),
+    BenchPosition('3x3 near-terminal', cells_from_moves([0, 4, 8, 2, 6, 3])),
+    BenchPosition('5x5 midgame', cells_from_moves([12, 6, 13, 11], 5), 5, 4),
+    BenchPosition('7x7 midgame', cells_from_moves([24, 16, 25, 23, 17, 31], 7), 7, 5),
+)
+
+
+class CaseResult(NamedTuple):
+    """Measurements for one engine / difficulty / position combination"""
+    engine: str
+    difficulty: str
+    position: str
+    runs: int
+    nodes: int
+    seconds: float
+    latency_ms: Dict[str, float]
+    peak_kib: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.engine}/{self.difficulty}/{self.position}"
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of the samples"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(samples: Sequence[float]) -> Dict[str, float]:
+    """Median, tail and extreme latencies in milliseconds"""
+    return {
+        'min': min(samples),
+        'p50': percentile(samples, 0.50),
+        'p90': percentile(samples, 0.90),
+        'p99': percentile(samples, 0.99),
+        'max': max(samples)
+    }
+
+
+def make_searcher(engine: str, difficulty: str, ai_player: str, seed: int,
+                  tablebase: Optional[Tablebase]) -> Callable[[Board], int]:
+    """Fresh engine for one run; returns board -> nodes searched"""
+    if engine == 'mcts':
+        mcts = MCTSEngine(seed=seed)
+        playouts = DIFFICULTY_PLAYOUTS[difficulty]
+        return lambda board: mcts.think(board, playouts=playouts).nodes
+
+    budget = DIFFICULTY_BUDGETS[difficulty]
+    mode = 'minimax' if engine == 'minimax' else 'alphabeta'
+    search = SearchEngine(ai_player=ai_player, human_player='O' if ai_player == 'X' else 'X',
+                          mode=mode, tablebase=tablebase if engine == 'tablebase' else None)
+    return lambda board: search.think(board, budget.time_ms, budget.max_depth).nodes
+
+
+def run_case(engine: str, difficulty: str, position: BenchPosition, repeat: int,
+             tablebase: Optional[Tablebase]) -> CaseResult:
+    """Time repeat cold searches of one position, then one more under tracemalloc"""
+    board = position.board()
+    ai_player = side_to_move(board.x_mask, board.o_mask)
+    latencies = []
+    nodes = 0
+    for run in range(repeat):
+        searcher = make_searcher(engine, difficulty, ai_player, run, tablebase)
+        started = time.perf_counter()
+        nodes += searcher(board.copy())
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    searcher = make_searcher(engine, difficulty, ai_player, repeat, tablebase)
+    tracemalloc.start()
+    try:
+        searcher(board.copy())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return CaseResult(engine, difficulty, position.name, repeat, nodes,
+                      sum(latencies) / 1000, latency_summary(latencies), peak / 1024)
+
+
+def bench_check_winner(size: int = 3, win_length: Optional[int] = None,
+                       count: int = 100000) -> Dict[str, float]:
+    """Nanoseconds per winner check: full line scan versus the Board's cached result"""
+    rng = random.Random(0)
+    geometry = Board(size=size, win_length=win_length).geometry
+    cells = list(range(geometry.cells))
+    positions = []
+    for _ in range(count):
+        rng.shuffle(cells)
+        placed = Board(size=size, win_length=win_length)
+        for ply, move in enumerate(cells[:rng.randrange(geometry.cells + 1)]):
+            placed[move] = 'X' if ply % 2 == 0 else 'O'
+        positions.append(placed)
+
+    started = time.perf_counter()
+    for placed in positions:
+        geometry.winner(placed.x_mask, placed.o_mask)
+    scan = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for placed in positions:
+        placed.winner()
+    cached = time.perf_counter() - started
+
+    return {
+        'full_scan_ns': scan / count * 1e9,
+        'cached_ns': cached / count * 1e9
+    }
+
+
+def check_symmetric_hits(size: int = 4, max_depth: Optional[int] = 1, positions: int = 100,
+                         mode: str = 'alphabeta', seed: int = 0) -> List[str]:
+    """Compare moves served from a cache with fresh searches, over all 8 symmetric variants
+
+    Each random position is searched in one variant to fill a private cache, then every
+    variant is searched again through the cache and without it. Returns one line per
+    variant whose moves differ.
+    """
+    symmetry = symmetry_for(size)
+    rng = random.Random(seed)
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SharedPositionCache(os.path.join(directory, 'check.cache'))
+        checked = 0
+        while checked < positions:
+            position = Position(0, 0, size)
+            for _ in range(rng.randrange(size * size - 1)):
+                moves = position.legal_moves()
+                if not moves:
+                    break
+                position = position.play(rng.choice(moves))
+            if position.winner() is not None:
+                continue
+            checked += 1
+            player = position.to_move
+            opponent = 'O' if player == 'X' else 'X'
+            variants = [position._replace(x_mask=symmetry.transform(position.x_mask, t),
+                                          o_mask=symmetry.transform(position.o_mask, t))
+                        for t in range(8)]
+            SearchEngine(ai_player=player, human_player=opponent, mode=mode,
+                         shared_cache=cache).think(rng.choice(variants), max_depth=max_depth)
+            for variant in variants:
+                cached = SearchEngine(ai_player=player, human_player=opponent, mode=mode,
+                                      shared_cache=cache).think(variant, max_depth=max_depth)
+                fresh = SearchEngine(ai_player=player, human_player=opponent,
+                                     mode=mode).think(variant, max_depth=max_depth)
+                if cached.move != fresh.move:
+                    problems.append(f"x={variant.x_mask:#x} o={variant.o_mask:#x}: cached move "
+                                    f"{cached.move}, fresh search {fresh.move}")
+        cache.close()
+    return problems
+
+
+def run_suite(repeat: int = 5, engines: Sequence[str] = ENGINE_NAMES,
+              difficulties: Sequence[str] = tuple(DIFFICULTY_BUDGETS),
+              position_filter: Optional[str] = None) -> Dict:
+    """Run every selected case and return the JSON-ready report"""
+    tablebase = Tablebase()
+    cases = []
+    for position in POSITIONS:
+        if position_filter and position_filter not in position.name:
+            continue
+        for engine in engines:
+            if engine == 'tablebase' and position.size != 3:
+                continue
+            for difficulty in difficulties:
+                # Depth-limited searches never consult the tablebase
+                if engine == 'tablebase' and DIFFICULTY_BUDGETS[difficulty].max_depth is not None:
+                    continue
+                cases.append(run_case(engine, difficulty, position, repeat, tablebase))
+    tablebase.close()
+
+    return {
+        'bench_version': BENCH_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'cases': {
+            case.key: {
+                'runs': case.runs,
+                'nodes': case.nodes,
+                'nodes_per_second': round(case.nodes_per_second, 1),
+                'latency_ms': {name: round(value, 4) for name, value in case.latency_ms.items()},
+                'peak_kib': round(case.peak_kib, 1)
+            }
+            for case in cases
+        },
+        'check_winner': {
+            '3x3': bench_check_winner(3),
+            '15x15 (5 in a row)': bench_check_winner(15, 5, 20000)
+        }
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Lines for cases whose median latency or nodes/s moved by more than threshold
+
+    Time-limited searches always take about their budget, so nodes/s is what moves there.
+    """
+    if baseline.get('bench_version') != report.get('bench_version'):
+        return [f"Baseline is bench version {baseline.get('bench_version')}, "
+                f"this run is {report.get('bench_version')}; not comparable"]
+    lines = []
+    for key, case in report['cases'].items():
+        old = baseline['cases'].get(key)
+        if old is None or old['latency_ms']['p50'] < MIN_COMPARABLE_MS:
+            continue
+        change = case['latency_ms']['p50'] / old['latency_ms']['p50'] - 1
+        if abs(change) > threshold:
+            verdict = 'REGRESSION' if change > 0 else 'improved'
+            lines.append(f"{verdict:<10} {key}: p50 {old['latency_ms']['p50']:.2f} -> "
+                         f"{case['latency_ms']['p50']:.2f} ms ({change:+.0%})")
+        if old['nodes_per_second'] > 0 and case['nodes_per_second'] > 0:
+            change = case['nodes_per_second'] / old['nodes_per_second'] - 1
+            if abs(change) > threshold:
+                verdict = 'REGRESSION' if change < 0 else 'improved'
+                lines.append(f"{verdict:<10} {key}: {old['nodes_per_second']:,.0f} -> "
+                             f"{case['nodes_per_second']:,.0f} nodes/s ({change:+.0%})")
+    return lines
+
+
+def print_report(report: Dict):
+    """Human-readable table of the report"""
+    print(f"{'case':<42} {'nodes/s':>12} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'peak KiB':>9}")
+    for key, case in report['cases'].items():
+        latency = case['latency_ms']
+        print(f"{key:<42} {case['nodes_per_second']:>12,.0f} {latency['p50']:>9.2f} "
+              f"{latency['p90']:>9.2f} {latency['p99']:>9.2f} {case['peak_kib']:>9.1f}")
+    for label, timing in report['check_winner'].items():
+        print(f"check_winner {label}: full scan {timing['full_scan_ns']:.0f} ns, "
+              f"cached {timing['cached_ns']:.0f} ns")
+
+
+def main():
+    """Command-line entry point for the benchmark suite"""
+    parser = argparse.ArgumentParser(description="Benchmark the Tic Tac Toe engines")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case")
+    parser.add_argument('--engine', action='append', choices=ENGINE_NAMES,
+                        help="Engine to include (repeatable; default all)")
+    parser.add_argument('--difficulty', action='append', choices=tuple(DIFFICULTY_BUDGETS),
+                        help="Difficulty to include (repeatable; default all)")
+    parser.add_argument('--positions', default=None, help="Only positions whose name contains this")
+    parser.add_argument('--output', default=None, help="Write the JSON report here")
+    parser.add_argument('--baseline', default=None, help="Earlier JSON report to compare against")
+    parser.add_argument('--check-cache', type=int, metavar='DEPTH', default=None,
+                        help="Only check cached moves on 4x4 at this depth (0: default depth)")
+    args = parser.parse_args()
+
+    if args.check_cache is not None:
+        problems = check_symmetric_hits(max_depth=args.check_cache or None)
+        print('\n'.join(problems + [f"{len(problems)} cached moves differ from fresh searches"]))
+        sys.exit(1 if problems else 0)
+
+    report = run_suite(args.repeat, args.engine or ENGINE_NAMES,
+                       args.difficulty or tuple(DIFFICULTY_BUDGETS), args.positions)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Wrote {args.output}")
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        lines = compare(report, baseline)
+        print('\n'.join(lines) if lines else "No changes beyond "
+              f"{REGRESSION_THRESHOLD:.0%} against {args.baseline}")
+        if any(line.startswith('REGRESSION') for line in lines):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
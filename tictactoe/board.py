@@ -0,0 +1,359 @@
+"""
+Bitboard representation of the game board
+Each player is stored as an integer bitmask; wins are mask-AND checks against precomputed lines.
+Boards are size x size with win_length in a row (3x3 with 3 in a row by default).
+"""
+
+from functools import lru_cache
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Row / column steps for horizontal, vertical, diagonal and anti-diagonal lines
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+MIN_SIZE = 3
+MAX_SIZE = 19
+
+
+def side_to_move(x_mask: int, o_mask: int) -> str:
+    """X always opens, so the piece counts decide who moves next"""
+    return 'X' if bin(x_mask).count('1') == bin(o_mask).count('1') else 'O'
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the indices of the set bits in ascending order"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Geometry:
+    """Cells, winning lines and neighbourhoods of a size x size, k-in-a-row board"""
+
+    def __init__(self, size: int = 3, win_length: Optional[int] = None):
+        win_length = size if win_length is None else win_length
+        if not MIN_SIZE <= size <= MAX_SIZE:
+            raise ValueError(f"Board size must be between {MIN_SIZE} and {MAX_SIZE}")
+        if not MIN_SIZE <= win_length <= size:
+            raise ValueError(f"Win length must be between {MIN_SIZE} and the board size")
+        self.size = size
+        self.win_length = win_length
+        self.cells = size * size
+        self.full_mask = (1 << self.cells) - 1
+
+        lines = []
+        for dr, dc in DIRECTIONS:
+            for row in range(size):
+                for col in range(size):
+                    end_row = row + dr * (win_length - 1)
+                    end_col = col + dc * (win_length - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        lines.append(tuple(
+                            (row + dr * step) * size + col + dc * step
+                            for step in range(win_length)
+                        ))
+        self.lines: Tuple[Tuple[int, ...], ...] = tuple(lines)
+        self.line_masks: Tuple[int, ...] = tuple(sum(1 << i for i in line) for line in lines)
+        self.lines_through: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(mask for mask in self.line_masks if mask >> cell & 1)
+            for cell in range(self.cells)
+        )
+
+        neighbours = []
+        for cell in range(self.cells):
+            row, col = divmod(cell, size)
+            mask = 0
+            for r in range(max(0, row - 1), min(size, row + 2)):
+                for c in range(max(0, col - 1), min(size, col + 2)):
+                    mask |= 1 << (r * size + c)
+            neighbours.append(mask & ~(1 << cell))
+        self.neighbours: Tuple[int, ...] = tuple(neighbours)
+
+        # Cells on more lines are stronger: center first, then corners, then edges on 3x3
+        self.move_order: Tuple[int, ...] = tuple(
+            sorted(range(self.cells), key=lambda cell: (-len(self.lines_through[cell]), cell))
+        )
+        self.move_rank: Tuple[int, ...] = tuple(self.move_order.index(i) for i in range(self.cells))
+        self.center = (size // 2) * size + size // 2
+
+    @property
+    def is_classic(self) -> bool:
+        """True for the standard 3x3, three-in-a-row game"""
+        return self.size == 3 and self.win_length == 3
+
+    def label(self) -> str:
+        """Human-readable description such as '5x5 (4 in a row)'"""
+        if self.win_length == self.size:
+            return f"{self.size}x{self.size}"
+        return f"{self.size}x{self.size} ({self.win_length} in a row)"
+
+    def has_line(self, mask: int) -> bool:
+        """True when the mask covers any winning line (full scan)"""
+        for line in self.line_masks:
+            if mask & line == line:
+                return True
+        return False
+
+    def completes_line(self, mask: int, cell: int) -> bool:
+        """True when a line through cell is covered; only those lines are checked"""
+        for line in self.lines_through[cell]:
+            if mask & line == line:
+                return True
+        return False
+
+    def winner(self, x_mask: int, o_mask: int) -> Optional[str]:
+        """Return 'X', 'O', 'tie' or None (full scan)"""
+        for line in self.line_masks:
+            if x_mask & line == line:
+                return 'X'
+            if o_mask & line == line:
+                return 'O'
+        if x_mask | o_mask == self.full_mask:
+            return 'tie'
+        return None
+
+    def winning_line(self, x_mask: int, o_mask: int) -> Optional[Tuple[int, ...]]:
+        """Cells of the first completed line, if any"""
+        for line, mask in zip(self.lines, self.line_masks):
+            if x_mask & mask == mask or o_mask & mask == mask:
+                return line
+        return None
+
+
+@lru_cache(maxsize=None)
+def geometry_for(size: int = 3, win_length: Optional[int] = None) -> Geometry:
+    """Shared Geometry instance per (size, win_length)"""
+    return Geometry(size, size if win_length is None else win_length)
+
+
+# Board choices offered by the front ends, as (size, win_length)
+BOARD_PRESETS = ((3, 3), (4, 4), (5, 4), (7, 5), (15, 5))
+
+
+def preset_labels() -> List[str]:
+    """Labels of the preset boards, e.g. '5x5 (4 in a row)'"""
+    return [geometry_for(size, win_length).label() for size, win_length in BOARD_PRESETS]
+
+
+def geometry_from_label(label: str) -> Geometry:
+    """Geometry for a preset label; falls back to the classic 3x3 board"""
+    for size, win_length in BOARD_PRESETS:
+        geometry = geometry_for(size, win_length)
+        if geometry.label() == label:
+            return geometry
+    return geometry_for(3)
+
+
+class Board:
+    """Two-bitmask board with a list-compatible view of 'X', 'O' and '' cells
+
+    Placing a piece only checks the lines through that cell, so winner() is O(1).
+    """
+
+    __slots__ = ('x_mask', 'o_mask', 'geometry', 'result')
+
+    def __init__(self, cells: Optional[Iterable[str]] = None,
+                 size: int = 3, win_length: Optional[int] = None):
+        self.geometry = geometry_for(size, win_length)
+        self.x_mask = 0
+        self.o_mask = 0
+        self.result: Optional[str] = None
+        if cells is not None:
+            for index, value in enumerate(cells):
+                if value:
+                    self[index] = value
+
+    @classmethod
+    def from_masks(cls, x_mask: int, o_mask: int,
+                   size: int = 3, win_length: Optional[int] = None) -> 'Board':
+        """Build a board directly from player masks"""
+        board = cls(size=size, win_length=win_length)
+        board.x_mask = x_mask
+        board.o_mask = o_mask
+        board.rescan()
+        return board
+
+    @property
+    def size(self) -> int:
+        return self.geometry.size
+
+    @property
+    def win_length(self) -> int:
+        return self.geometry.win_length
+
+    def __len__(self) -> int:
+        return self.geometry.cells
+
+    def _check_index(self, index: int) -> int:
+        cells = self.geometry.cells
+        if index < 0:
+            index += cells
+        if not 0 <= index < cells:
+            raise IndexError("board index out of range")
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(self.geometry.cells)[index]]
+        bit = 1 << self._check_index(index)
+        if self.x_mask & bit:
+            return 'X'
+        if self.o_mask & bit:
+            return 'O'
+        return ''
+
+    def __setitem__(self, index: int, value: str):
+        index = self._check_index(index)
+        bit = 1 << index
+        replaced = (self.x_mask | self.o_mask) & bit
+        self.x_mask &= ~bit
+        self.o_mask &= ~bit
+        if value == 'X':
+            self.x_mask |= bit
+        elif value == 'O':
+            self.o_mask |= bit
+        elif value:
+            raise ValueError(f"Invalid cell value: {value!r}")
+
+        if replaced:
+            self.rescan()
+        elif value and self.result is None:
+            mask = self.x_mask if value == 'X' else self.o_mask
+            if self.geometry.completes_line(mask, index):
+                self.result = value
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.geometry.cells):
+            yield self[index]
+
+    def __contains__(self, value) -> bool:
+        if value == '':
+            return self.x_mask | self.o_mask != self.geometry.full_mask
+        if value == 'X':
+            return self.x_mask != 0
+        if value == 'O':
+            return self.o_mask != 0
+        return False
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Board):
+            return (self.x_mask == other.x_mask and self.o_mask == other.o_mask
+                    and self.geometry is other.geometry)
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.x_mask, self.o_mask, self.geometry.size, self.geometry.win_length))
+
+    def __repr__(self) -> str:
+        if self.geometry.is_classic:
+            return f"Board({list(self)!r})"
+        return (f"Board({list(self)!r}, size={self.geometry.size}, "
+                f"win_length={self.geometry.win_length})")
+
+    def rescan(self):
+        """Recompute the cached result from scratch"""
+        winner = self.geometry.winner(self.x_mask, self.o_mask)
+        self.result = winner if winner in ('X', 'O') else None
+
+    def copy(self) -> 'Board':
+        """Independent copy of this board"""
+        board = Board.__new__(Board)
+        board.geometry = self.geometry
+        board.x_mask = self.x_mask
+        board.o_mask = self.o_mask
+        board.result = self.result
+        return board
+
+    def masks_for(self, player: str) -> Tuple[int, int]:
+        """Return (player_mask, opponent_mask)"""
+        if player == 'X':
+            return self.x_mask, self.o_mask
+        return self.o_mask, self.x_mask
+
+    def empty_mask(self) -> int:
+        """Bitmask of the empty cells"""
+        return self.geometry.full_mask & ~(self.x_mask | self.o_mask)
+
+    def empty_cells(self) -> List[int]:
+        """Indices of the empty cells"""
+        return list(iter_bits(self.empty_mask()))
+
+    def winner(self) -> Optional[str]:
+        """Return 'X', 'O', 'tie' or None"""
+        if self.result is not None:
+            return self.result
+        if self.x_mask | self.o_mask == self.geometry.full_mask:
+            return 'tie'
+        return None
+
+    def winning_line(self) -> Optional[Tuple[int, ...]]:
+        """Cells of the first completed line, if any"""
+        return self.geometry.winning_line(self.x_mask, self.o_mask)
+
+    def position(self) -> 'Position':
+        """Immutable snapshot of this board"""
+        return Position(self.x_mask, self.o_mask, self.geometry.size, self.geometry.win_length)
+
+
+class _PositionFields(NamedTuple):
+    x_mask: int
+    o_mask: int
+    size: int
+    win_length: int
+
+
+class Position(_PositionFields):
+    """Immutable board position, safe to share between threads and processes
+
+    win_length defaults to size, as for Board. Moves return a new Position instead of
+    changing this one.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, x_mask: int, o_mask: int, size: int = 3,
+                win_length: Optional[int] = None) -> 'Position':
+        return super().__new__(cls, x_mask, o_mask, size, size if win_length is None else win_length)
+
+    @classmethod
+    def from_cells(cls, cells: Iterable[str], size: int = 3,
+                   win_length: Optional[int] = None) -> 'Position':
+        """Position of a list of 'X', 'O' and '' cells"""
+        return Board(cells, size, win_length).position()
+
+    @property
+    def geometry(self) -> Geometry:
+        return geometry_for(self.size, self.win_length)
+
+    @property
+    def to_move(self) -> str:
+        return side_to_move(self.x_mask, self.o_mask)
+
+    def winner(self) -> Optional[str]:
+        """Return 'X', 'O', 'tie' or None"""
+        return self.geometry.winner(self.x_mask, self.o_mask)
+
+    def legal_moves(self) -> List[int]:
+        """Empty cells, or none once the game is over"""
+        if self.winner() is not None:
+            return []
+        return list(iter_bits(self.geometry.full_mask & ~(self.x_mask | self.o_mask)))
+
+    def play(self, index: int) -> 'Position':
+        """Position after the side to move takes a cell"""
+        if not 0 <= index < self.geometry.cells:
+            raise IndexError("board index out of range")
+        bit = 1 << index
+        if (self.x_mask | self.o_mask) & bit or self.winner() is not None:
+            raise ValueError(f"Illegal move: {index}")
+        if self.to_move == 'X':
+            return self._replace(x_mask=self.x_mask | bit)
+        return self._replace(o_mask=self.o_mask | bit)
+
+    def board(self) -> Board:
+        """Mutable Board holding this position"""
+        return Board.from_masks(self.x_mask, self.o_mask, self.size, self.win_length)
+
@@ -0,0 +1,219 @@
+"""
+Shared position cache
+A fixed-size hash table in a memory-mapped file, so every process and thread that opens
+the same file (server workers, tournament workers, the GUI) reuses positions any of
+them has already searched. Slots are grouped in small sets with CLOCK eviction.
+
+Each slot has a sequence number that is odd while a write is in progress; readers
+check it before and after reading and ignore the slot if it moved. The stored check is
+also bound to the slot's contents, so even two writers interleaving on one slot cannot
+leave a mix that is accepted: a torn or lost update only ever costs a miss.
+
+The format version and slot layout are part of the file name, so a file is never
+resized or rewritten under a process that has it mapped; a file whose header does not
+match leaves the cache unavailable.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, NamedTuple, Optional
+
+MAGIC = b'TTPC'
+VERSION = 4
+HEADER = struct.Struct('<4sHHI')        # magic, version, ways per set, set count
+# sequence, key, check, score, move, depth, tied moves, reference bit
+SLOT = struct.Struct('<QQQdhhHBx')
+SEQUENCE = struct.Struct('<Q')
+KEY = struct.Struct('<QQ')
+BODY = struct.Struct('<dhhH')           # score, move, depth, tied moves
+KEY_OFFSET = SEQUENCE.size              # offset of the key in a slot
+REFERENCE = SLOT.size - 2               # offset of the reference bit in a slot
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.tictactoe', 'positions.cache')
+DEFAULT_SLOTS = 1 << 16
+WAYS = 8
+
+# Stored depth for results that are exact (searched to the end or a forced result)
+EXACT = -1
+
+# Boards up to this many cells also store the mask of moves tied for best
+MASK_CELLS = 16
+
+MODE_CODES = {'minimax': 0, 'alphabeta': 1}
+
+
+class CachedResult(NamedTuple):
+    """A stored search result; depth is None when the result is exact
+
+    moves is the bitmask of every move as good as move, or 0 when it is not known.
+    """
+    move: Optional[int]
+    score: Optional[float]
+    depth: Optional[int]
+    moves: int = 0
+
+
+def layout_path(path: str, ways: int, sets: int) -> str:
+    """File for a cache path with this format version and layout, e.g. positions.v4-8x8192.cache"""
+    base, extension = os.path.splitext(path)
+    return f"{base}.v{VERSION}-{ways}x{sets}{extension}"
+
+
+def position_digest(x_mask: int, o_mask: int, size: int, win_length: int,
+                    player: str, mode: str) -> bytes:
+    """16-byte digest identifying a position searched for player in a given mode"""
+    width = (size * size + 7) // 8
+    data = (x_mask.to_bytes(width, 'little') + o_mask.to_bytes(width, 'little')
+            + bytes((size, win_length, player == 'X', MODE_CODES.get(mode, 0))))
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def body_check(score: float, move: int, depth: int, moves: int) -> int:
+    """64-bit hash of a slot's contents, mixed into its stored check"""
+    return int.from_bytes(hashlib.blake2b(BODY.pack(score, move, depth, moves),
+                                          digest_size=8).digest(), 'little')
+
+
+class SharedPositionCache:
+    """Bounded mmap hash table of search results, shared between processes
+
+    path names the cache; the file actually used is layout_path() of it. The file is
+    created on first use; if it cannot be mapped the cache stays unavailable and every
+    lookup misses.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, slots: int = DEFAULT_SLOTS, ways: int = WAYS):
+        self.ways = ways
+        self.sets = max(1, slots // ways)
+        self.path = layout_path(path, self.ways, self.sets)
+        self.data: Optional[mmap.mmap] = None
+        self.available: Optional[bool] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hand = 0       # clock hand, shared by all sets of this process
+        self.open_lock = threading.Lock()
+
+    def open(self) -> bool:
+        """Map the file, initializing it if it is new"""
+        if self.available is not None:
+            return self.available
+        with self.open_lock:
+            if self.available is None:
+                self.available = self.map_file()
+        return self.available
+
+    def map_file(self) -> bool:
+        size = HEADER.size + self.sets * self.ways * SLOT.size
+        header = HEADER.pack(MAGIC, VERSION, self.ways, self.sets)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            descriptor = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            with os.fdopen(descriptor, 'r+b') as handle:
+                current = handle.read(HEADER.size)
+                if not current:
+                    # New file; processes racing to create it write the same bytes
+                    handle.truncate(size)
+                    handle.write(header)
+                    handle.flush()
+                elif current != header or os.fstat(handle.fileno()).st_size != size:
+                    # Not ours to fix: another process may have it mapped
+                    return False
+                self.data = mmap.mmap(handle.fileno(), size)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def close(self):
+        """Unmap the file"""
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        self.available = None
+
+    def slot_offset(self, key: int, way: int) -> int:
+        """Byte offset of one way of the key's set"""
+        return HEADER.size + ((key % self.sets) * self.ways + way) * SLOT.size
+
+    def get(self, digest: bytes) -> Optional[CachedResult]:
+        """Stored result for a position digest, if present"""
+        if not self.open():
+            return None
+        key, check = KEY.unpack(digest)
+        key = key or 1
+        data = self.data
+        for way in range(self.ways):
+            offset = self.slot_offset(key, way)
+            (sequence, slot_key, slot_check, score, move, depth, moves,
+             referenced) = SLOT.unpack_from(data, offset)
+            if slot_key == key:
+                # A write in progress or in between, or a mix of two writes, is a miss
+                if (sequence & 1 or SEQUENCE.unpack_from(data, offset)[0] != sequence
+                        or slot_check != check ^ body_check(score, move, depth, moves)):
+                    break
+                if not referenced:
+                    data[offset + REFERENCE] = 1
+                self.hits += 1
+                return CachedResult(None if move < 0 else move,
+                                    None if math.isnan(score) else score,
+                                    None if depth == EXACT else depth, moves)
+        self.misses += 1
+        return None
+
+    def put(self, digest: bytes, result: CachedResult):
+        """Store a result, evicting by CLOCK within the position's set"""
+        if not self.open():
+            return
+        key, check = KEY.unpack(digest)
+        key = key or 1
+        data = self.data
+        victim = None
+        for way in range(self.ways):
+            offset = self.slot_offset(key, way)
+            slot_key = KEY.unpack_from(data, offset + KEY_OFFSET)[0]
+            if slot_key == key or slot_key == 0:
+                victim = offset
+                break
+        if victim is None:
+            # Second chance: clear reference bits until an unreferenced slot turns up
+            for step in range(2 * self.ways):
+                way = (self.hand + step) % self.ways
+                offset = self.slot_offset(key, way)
+                flag = offset + REFERENCE
+                if data[flag]:
+                    data[flag] = 0
+                else:
+                    victim = offset
+                    self.hand = (way + 1) % self.ways
+                    break
+            self.evictions += 1
+
+        move = -1 if result.move is None else result.move
+        score = math.nan if result.score is None else result.score
+        depth = EXACT if result.depth is None else result.depth
+        # Odd while writing; a slot left odd by a writer that died is simply taken over
+        busy = SEQUENCE.unpack_from(data, victim)[0] | 1
+        SEQUENCE.pack_into(data, victim, busy)
+        stored_check = check ^ body_check(score, move, depth, result.moves)
+        SLOT.pack_into(data, victim, busy, key, stored_check, score, move, depth, result.moves, 0)
+        SEQUENCE.pack_into(data, victim, busy + 1)
+
+    def clear(self):
+        """Empty every slot"""
+        if self.open():
+            self.data[HEADER.size:] = bytes(len(self.data) - HEADER.size)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters of this process"""
+        return {
+            'shared_hits': self.hits,
+            'shared_misses': self.misses,
+            'shared_evictions': self.evictions,
+            'shared_slots': self.sets * self.ways
+        }
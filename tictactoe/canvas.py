@@ -0,0 +1,190 @@
+"""
+Canvas board renderer
+Draws the grid and the marks as items on a single tk.Canvas instead of one Button per
+cell. Changes only mark cells dirty; one flush per Tk idle pass reconfigures just the
+items of those cells, and only the options that actually changed.
+"""
+
+import tkinter as tk
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+def cell_gap(size: int) -> int:
+    """Pixels between neighbouring cells"""
+    return 2 if size <= 7 else 1
+
+
+class BoardCanvas:
+    """Square board of size x size cells drawn on one canvas
+
+    on_click(index) fires for clicks on a cell; on_hover(index, entering) when the
+    pointer enters or leaves one. Every cell also has a small note in its corner, for
+    annotations such as move evaluations.
+    """
+
+    def __init__(self, parent, pixels: int, colors: Dict[str, str],
+                 on_click: Callable[[int], None],
+                 on_hover: Optional[Callable[[int, bool], None]] = None,
+                 font_family: str = 'Segoe UI'):
+        self.pixels = pixels
+        self.colors = colors                # needs 'background' and 'surface'
+        self.on_click = on_click
+        self.on_hover = on_hover
+        self.font_family = font_family
+        self.canvas = tk.Canvas(parent, width=pixels, height=pixels, bg=colors['background'],
+                                highlightthickness=0, bd=0, cursor='hand2')
+        self.canvas.bind('<Button-1>', self.on_press)
+        self.canvas.bind('<Motion>', self.on_motion)
+        self.canvas.bind('<Leave>', lambda event: self.hover(None))
+
+        self.size = 0
+        self.pitch = 0
+        self.gap = 0
+        self.font_size = 0
+        self.rects: List[int] = []
+        self.texts: List[int] = []
+        self.note_texts: List[int] = []
+        self.note_font_size = 0
+        # Wanted state per cell, and what is currently on the canvas
+        self.marks: List[str] = []
+        self.mark_colors: List[str] = []
+        self.fills: List[Optional[str]] = []
+        self.grow: List[int] = []
+        self.notes: List[Tuple[str, str]] = []
+        self.drawn: List[Tuple] = []
+        self.dirty: Set[int] = set()
+        self.flush_job = None
+        self.hovered: Optional[int] = None
+        self.redraws = 0
+
+    def pack(self, **options):
+        self.canvas.pack(**options)
+
+    def resize(self, size: int, font_size: Optional[int] = None):
+        """Rebuild the items for a size x size board; every cell starts empty"""
+        canvas = self.canvas
+        canvas.delete('all')
+        self.size = size
+        self.gap = cell_gap(size)
+        self.pitch = self.pixels // size
+        cell = self.pitch - self.gap
+        self.font_size = font_size or max(6, cell // 3)
+        self.note_font_size = max(6, min(9, cell // 5))
+        self.rects = []
+        self.texts = []
+        self.note_texts = []
+        for index in range(size * size):
+            x0, y0 = (index % size) * self.pitch, (index // size) * self.pitch
+            self.rects.append(canvas.create_rectangle(x0, y0, x0 + cell, y0 + cell, width=0,
+                                                      fill=self.colors['surface']))
+            self.texts.append(canvas.create_text(x0 + cell // 2, y0 + cell // 2, text='',
+                                                 font=(self.font_family, self.font_size, 'bold')))
+            self.note_texts.append(canvas.create_text(x0 + cell - 2, y0 + cell - 1, text='', anchor='se',
+                                                      font=(self.font_family, self.note_font_size)))
+        cells = size * size
+        self.marks = [''] * cells
+        self.mark_colors = [''] * cells
+        self.fills = [None] * cells
+        self.grow = [0] * cells
+        self.notes = [('', '')] * cells
+        self.drawn = [(self.colors['surface'], '', '', self.font_size, '', '')] * cells
+        self.dirty.clear()
+        self.hovered = None
+
+    def cell_at(self, x: int, y: int) -> Optional[int]:
+        """Index of the cell under a canvas point, or None over a gap or outside"""
+        if not self.pitch or x < 0 or y < 0:
+            return None
+        col, x_offset = divmod(int(x), self.pitch)
+        row, y_offset = divmod(int(y), self.pitch)
+        if col >= self.size or row >= self.size:
+            return None
+        if x_offset >= self.pitch - self.gap or y_offset >= self.pitch - self.gap:
+            return None
+        return row * self.size + col
+
+    def on_press(self, event):
+        index = self.cell_at(event.x, event.y)
+        if index is not None:
+            self.on_click(index)
+
+    def on_motion(self, event):
+        self.hover(self.cell_at(event.x, event.y))
+
+    def hover(self, index: Optional[int]):
+        if index == self.hovered:
+            return
+        previous, self.hovered = self.hovered, index
+        if self.on_hover is not None:
+            if previous is not None:
+                self.on_hover(previous, False)
+            if index is not None:
+                self.on_hover(index, True)
+
+    def set_mark(self, index: int, mark: str, color: str = ''):
+        """Show a mark (or '' for none) in a cell"""
+        self.marks[index] = mark
+        self.mark_colors[index] = color
+        self.invalidate(index)
+
+    def set_fill(self, index: int, color: Optional[str]):
+        """Cell background; None restores the normal surface colour"""
+        self.fills[index] = color
+        self.invalidate(index)
+
+    def set_grow(self, index: int, points: int):
+        """Enlarge a cell's mark by points, for scale animations"""
+        self.grow[index] = points
+        self.invalidate(index)
+
+    def set_note(self, index: int, text: str, color: str = ''):
+        """Small text in a cell's corner; '' removes it"""
+        self.notes[index] = (text, color)
+        self.invalidate(index)
+
+    def clear_notes(self):
+        """Remove every cell's note"""
+        for index, note in enumerate(self.notes):
+            if note[0]:
+                self.set_note(index, '')
+
+    def clear(self):
+        """Empty every cell and drop highlights and notes"""
+        for index in range(len(self.marks)):
+            if (self.marks[index] or self.fills[index] is not None or self.grow[index]
+                    or self.notes[index][0]):
+                self.marks[index] = ''
+                self.fills[index] = None
+                self.grow[index] = 0
+                self.notes[index] = ('', '')
+                self.invalidate(index)
+
+    def invalidate(self, index: int):
+        """Mark a cell for the next flush"""
+        self.dirty.add(index)
+        if self.flush_job is None:
+            self.flush_job = self.canvas.after_idle(self.flush)
+
+    def flush(self):
+        """Push the dirty cells' state to their canvas items"""
+        self.flush_job = None
+        canvas = self.canvas
+        surface = self.colors['surface']
+        for index in self.dirty:
+            if index >= len(self.drawn):
+                continue
+            wanted = (self.fills[index] or surface, self.marks[index], self.mark_colors[index],
+                      self.font_size + self.grow[index]) + self.notes[index]
+            drawn = self.drawn[index]
+            if wanted == drawn:
+                continue
+            if wanted[0] != drawn[0]:
+                canvas.itemconfigure(self.rects[index], fill=wanted[0])
+            if wanted[1:4] != drawn[1:4]:
+                canvas.itemconfigure(self.texts[index], text=wanted[1], fill=wanted[2],
+                                     font=(self.font_family, wanted[3], 'bold'))
+            if wanted[4:] != drawn[4:]:
+                canvas.itemconfigure(self.note_texts[index], text=wanted[4], fill=wanted[5])
+            self.drawn[index] = wanted
+            self.redraws += 1
+        self.dirty.clear()
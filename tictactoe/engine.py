@@ -0,0 +1,837 @@
+"""
+Search engine for the computer player
+Minimax or alpha-beta backed by a transposition table so every position is solved only once.
+Boards larger than 3x3 are searched to a depth limit with a line-counting evaluation.
+Wins score higher the sooner they happen and losses the later, so the computer closes
+out won games quickly and drags out lost ones.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import (TYPE_CHECKING, Any, Dict, Hashable, Iterator, List, NamedTuple, Optional,
+                    Sequence, Tuple, Union)
+
+from . import instrument
+from .board import Board, Geometry, Position, geometry_for, iter_bits, side_to_move
+from .cache import MASK_CELLS, CachedResult, SharedPositionCache, position_digest
+from .symmetry import symmetry_for
+
+if TYPE_CHECKING:
+    from .tablebase import Tablebase
+
+# Bumped whenever the engine would pick different moves, and stored in game records
+ENGINE_VERSION = 3
+
+EVICTION_POLICIES = ('lru', 'fifo')
+SEARCH_MODES = ('minimax', 'alphabeta')
+
+# Transposition entry bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Remaining-depth marker for entries searched to the end of the game
+EXACT_DEPTH = 1 << 30
+
+# Analysis score of a won position, less the pieces on the board when it is won, so
+# faster wins and slower losses score higher
+WIN_SCORE = 1000
+
+# Root scores closer than this are ties, broken by the lowest cell index
+TIE_MARGIN = 1e-9
+
+# Canonicalizing positions costs more than it saves on bigger boards
+MAX_SYMMETRY_SIZE = 4
+
+# Boards with more cells only consider empty cells next to existing pieces
+LOCAL_MOVES_ABOVE = 16
+
+# Heuristic weight of an open line holding n of one player's pieces
+LINE_WEIGHTS = tuple(4 ** n if n else 0 for n in range(20))
+EVAL_SCALE = 64.0
+
+
+def default_depth(geometry: Geometry) -> Optional[int]:
+    """Depth limit that keeps a move responsive; None searches to the end"""
+    if geometry.cells <= 9:
+        return None
+    if geometry.cells <= 16:
+        return 6
+    if geometry.cells <= 25:
+        return 4
+    if geometry.cells <= 49:
+        return 3
+    return 2
+
+
+class SearchCancelled(Exception):
+    """Raised inside a search when its stop event is set"""
+
+
+class SearchTimeout(SearchCancelled):
+    """Raised inside a search when its time budget runs out"""
+
+
+class TranspositionTable:
+    """Bounded position -> (score, bound) cache with LRU or FIFO eviction"""
+
+    def __init__(self, max_entries: int = 200000, eviction: str = 'lru'):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Look up a cached entry, counting the hit or miss"""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.eviction == 'lru':
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store an entry, evicting the oldest one when full"""
+        if key in self.entries:
+            self.entries[key] = value
+            if self.eviction == 'lru':
+                self.entries.move_to_end(key)
+            return
+        if len(self.entries) >= self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        self.entries[key] = value
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for inspection"""
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class SearchResult(NamedTuple):
+    """Outcome of one root search"""
+    move: Optional[int]
+    score: Optional[float]          # above 1 a forced win, below -1 a forced loss
+    nodes: int
+    depth: Optional[int] = None     # horizon searched; None means to the end of the game
+
+
+class SearchBudget(NamedTuple):
+    """Per-move thinking allowance"""
+    time_ms: Optional[float]
+    max_depth: Optional[int]
+
+
+class MoveAnalysis(NamedTuple):
+    """One legal move, scored for the side to move"""
+    move: int
+    value: float                # 1 win, 0 draw, -1 loss; in (-1, 1) when only estimated
+    distance: Optional[int]     # plies to the end of the game with best play; None if estimated
+    pv: Tuple[int, ...]         # principal variation, starting with move
+    exact: bool
+
+
+class Analysis(NamedTuple):
+    """Every legal move of a position, best first"""
+    player: str
+    moves: List[MoveAnalysis]
+    nodes: int
+    depth: Optional[int]        # horizon searched; None means to the end of the game
+
+    @property
+    def best(self) -> Optional[MoveAnalysis]:
+        return self.moves[0] if self.moves else None
+
+
+# What each difficulty level may spend on a move
+DIFFICULTY_BUDGETS = {
+    'easy': SearchBudget(50, 1),
+    'medium': SearchBudget(250, 3),
+    'hard': SearchBudget(1000, None)
+}
+
+
+class SearchEngine:
+    """Reusable minimax / alpha-beta search for the computer player
+
+    max_depth=None searches 3x3 to the end and picks default_depth() for bigger boards.
+    A shared_cache is consulted before searching and filled afterwards, so positions
+    searched by any engine using the same cache file are not searched again.
+
+    Searches never modify the board they are given, but an engine keeps the state of
+    the running search, so it serves one caller at a time; EnginePool hands concurrent
+    callers engines of their own.
+    """
+
+    def __init__(self, table: Optional[TranspositionTable] = None,
+                 ai_player: str = 'O', human_player: str = 'X',
+                 mode: str = 'minimax', tablebase: Optional['Tablebase'] = None,
+                 use_symmetry: bool = True, max_depth: Optional[int] = None,
+                 shared_cache: Optional[SharedPositionCache] = None):
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        self.table = table if table is not None else TranspositionTable()
+        self.ai_player = ai_player
+        self.human_player = human_player
+        self.mode = mode
+        self.tablebase = tablebase
+        self.use_symmetry = use_symmetry
+        self.max_depth = max_depth
+        self.shared_cache = shared_cache
+        self.geometry: Optional[Geometry] = None
+        self.symmetry = None
+        self.horizon: Optional[int] = None
+        self.nodes = 0
+        self.cutoffs = 0
+        self.stop: Optional[threading.Event] = None
+        self.deadline: Optional[float] = None
+        self.killers: List[List[int]] = []
+        self.history: Dict[bool, List[int]] = {}
+        self.last_result: Optional[SearchResult] = None
+        self.root_moves = 0     # every move tied for best in the last finished root search
+        # Analysis positions keep absolute scores, so they stay valid between calls
+        self.analysis_table = TranspositionTable()
+        self.prepare(geometry_for(3))
+
+    def prepare(self, geometry: Geometry):
+        """Switch to a board geometry, dropping cached positions from another one"""
+        if geometry is not self.geometry:
+            if self.geometry is not None:
+                self.table.clear()
+                self.analysis_table.clear()
+            self.geometry = geometry
+            if self.use_symmetry and geometry.size <= MAX_SYMMETRY_SIZE:
+                self.symmetry = symmetry_for(geometry.size)
+            else:
+                self.symmetry = None
+        self.horizon = self.max_depth if self.max_depth is not None else default_depth(geometry)
+
+    def best_move(self, board: Sequence[str], stop: Optional[threading.Event] = None) -> Optional[int]:
+        """Pick the best move for the computer"""
+        return self.search(board, stop).move
+
+    @instrument.traced('search', 'engine')
+    def search(self, board: Sequence[str], stop: Optional[threading.Event] = None) -> SearchResult:
+        """Search the position and report move, score and nodes visited
+
+        Setting the optional stop event aborts the search with SearchCancelled.
+        """
+        board = self.start_search(board, stop)
+        result = self.probe_tablebase(board) or self.probe_shared(board, self.horizon)
+        if result is None:
+            move, score = self.search_root(board)
+            result = SearchResult(move, score, self.nodes, self.horizon)
+            self.store_shared(board, result)
+        self.last_result = result
+        self.trace_counters()
+        return result
+
+    @instrument.traced('think', 'engine')
+    def think(self, board: Sequence[str], time_ms: Optional[float] = None,
+              max_depth: Optional[int] = None,
+              stop: Optional[threading.Event] = None) -> SearchResult:
+        """Iterative deepening within a time budget
+
+        Searches depth 1, 2, ... up to max_depth (None: to the end of the game) and returns
+        the result of the deepest iteration that finished before time_ms ran out.
+        """
+        board = self.start_search(board, stop)
+        result = self.probe_tablebase(board) if max_depth is None else None
+        if result is None:
+            # Without a depth limit, anything at least as deep as search() would go will do
+            result = (self.probe_shared(board, max_depth) if max_depth is not None
+                      else self.probe_shared(board, default_depth(self.geometry), deeper=True))
+        if result is not None:
+            self.last_result = result
+            self.trace_counters()
+            return result
+
+        remaining = bin(board.empty_mask()).count('1')
+        limit = remaining if max_depth is None else min(max_depth, remaining)
+        if time_ms is not None:
+            self.deadline = time.perf_counter() + time_ms / 1000.0
+        try:
+            for depth in range(1, limit + 1):
+                self.horizon = depth
+                first_move = result.move if result is not None else None
+                move, score = self.search_root(board, first_move)
+                result = SearchResult(move, score, self.nodes, depth)
+                # A forced win or loss inside the horizon will not change with more depth
+                if score is not None and abs(score) >= 1:
+                    plies = min(self.win_plies(score, board), limit) if score > 0 else depth
+                    if plies != depth:
+                        # Found early through the table: search exactly as deep as the win,
+                        # but never past max_depth, so every move winning as fast is
+                        # scored and ties break as usual
+                        self.horizon = plies
+                        move, score = self.search_root(board)
+                        result = SearchResult(move, score, self.nodes, plies)
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+
+        if result is None:
+            # Not even depth 1 finished: fall back to the statically best-ordered move
+            ai_mask, human_mask = board.masks_for(self.ai_player)
+            moves = self.ordered_moves(self.candidate_mask(ai_mask | human_mask), 0, True)
+            result = SearchResult(moves[0] if moves else None, None, self.nodes, 0)
+            self.root_moves = 1 << moves[0] if moves else 0
+        self.store_shared(board, result)
+        self.last_result = result
+        self.trace_counters()
+        return result
+
+    def start_search(self, board: Sequence[str], stop: Optional[threading.Event]) -> Board:
+        """Reset per-search state and return the position as a Board"""
+        if isinstance(board, Position):
+            board = board.board()
+        elif not isinstance(board, Board):
+            board = Board(board)
+        self.prepare(board.geometry)
+        self.nodes = 0
+        self.cutoffs = 0
+        self.stop = stop
+        self.deadline = None
+        cells = self.geometry.cells
+        self.killers = [[] for _ in range(cells + 1)]
+        self.history = {True: [0] * cells, False: [0] * cells}
+        return board
+
+    def probe_tablebase(self, board: Board) -> Optional[SearchResult]:
+        """Instant answer from the tablebase, when one applies"""
+        if (self.tablebase is None or not board.geometry.is_classic
+                or side_to_move(board.x_mask, board.o_mask) != self.ai_player):
+            return None
+        entry = self.tablebase.probe(board)
+        if entry is None or not entry.moves:
+            return None
+        score = 0
+        if entry.value:
+            # Same scale as the search: the tablebase distance says when the game ends
+            pieces = bin(board.x_mask | board.o_mask).count('1')
+            score = entry.value * self.win_score(pieces + entry.distance)
+        return SearchResult(next(iter_bits(entry.moves)), score, 0, 0)
+
+    def shared_key(self, board: Board) -> Tuple[bytes, int]:
+        """Key of this position for the shared cache, plus the transform to its canonical form
+
+        With symmetry on, all 8 variants of a position share one entry whose moves are
+        stored in the canonical frame.
+        """
+        x_mask, o_mask, transform = board.x_mask, board.o_mask, 0
+        if self.symmetry is not None:
+            x_mask, o_mask, transform = self.symmetry.canonical(x_mask, o_mask)
+        return position_digest(x_mask, o_mask, board.size, board.win_length,
+                               self.ai_player, self.mode), transform
+
+    def probe_shared(self, board: Board, depth: Optional[int],
+                     deeper: bool = False) -> Optional[SearchResult]:
+        """Stored result of a search to exactly depth (None: to the end of the game)
+
+        Deeper results are only used when deeper is set, so the depth-limited levels
+        keep playing at their own depth.
+        """
+        if self.shared_cache is None:
+            return None
+        digest, transform = self.shared_key(board)
+        entry = self.shared_cache.get(digest)
+        if entry is None:
+            return None
+        remaining = bin(board.empty_mask()).count('1')
+        needed = None if depth is None or depth >= remaining else depth
+        if entry.depth != needed and not (deeper and (entry.depth is None or
+                                                      needed is not None and entry.depth > needed)):
+            return None
+        move, moves = entry.move, entry.moves
+        if transform:
+            move = self.symmetry.move_from_canonical(move, transform)
+            moves = self.symmetry.mask_from_canonical(moves, transform)
+        if moves:
+            # Lowest index among the tied moves, as a fresh search would pick; the stored
+            # move is the one the storing caller played, in its own frame
+            move = next(iter_bits(moves))
+        return SearchResult(move, entry.score, 0, entry.depth)
+
+    def store_shared(self, board: Board, result: SearchResult):
+        """Publish a finished search to the shared cache"""
+        if self.shared_cache is None or result.move is None or result.score is None:
+            return
+        remaining = bin(board.empty_mask()).count('1')
+        exact = result.depth is None or result.depth >= remaining
+        digest, transform = self.shared_key(board)
+        move, moves = result.move, self.root_moves
+        if not moves >> move & 1 or moves >> MASK_CELLS:
+            # Ties unknown for this result, or too many cells to record them
+            moves = 0
+        if transform:
+            move = self.symmetry.move_to_canonical(move, transform)
+            moves = self.symmetry.transform(moves, transform)
+        self.shared_cache.put(digest, CachedResult(move, result.score,
+                                                   None if exact else result.depth, moves))
+
+    @instrument.traced('analyze', 'engine')
+    def analyze(self, board: Sequence[str], stop: Optional[threading.Event] = None) -> Analysis:
+        """Value, distance to the end and principal variation of every legal move
+
+        Every searched move gets a full-window search, so its value is exact within the
+        horizon; the positions below are shared between moves and calls. On big boards,
+        cells away from all pieces are only scored statically.
+        """
+        board = self.start_search(board, stop)
+        player = side_to_move(board.x_mask, board.o_mask)
+        if board.winner() is not None:
+            return Analysis(player, [], 0, self.horizon)
+        mine, theirs = board.masks_for(player)
+        occupied = mine | theirs
+        pieces = bin(occupied).count('1')
+        empty = self.geometry.full_mask & ~occupied
+        candidates = self.candidate_mask(occupied)
+        remaining = None if self.horizon is None else self.horizon - 1
+
+        scored = []
+        for i in iter_bits(empty):
+            if candidates >> i & 1:
+                score, pv = self.analysis_negamax(theirs, mine | (1 << i), i, remaining,
+                                                  -WIN_SCORE - 1, WIN_SCORE + 1)
+                scored.append((True, -score, (i,) + pv))
+            else:
+                scored.append((False, self.evaluate(mine | (1 << i), theirs), (i,)))
+
+        # Static scores do not compare with searched ones, so those moves come last
+        rank = self.geometry.move_rank
+        scored.sort(key=lambda item: (not item[0], -item[1], rank[item[2][0]]))
+        moves = []
+        for _, score, pv in scored:
+            if abs(score) >= 1:
+                value = 1 if score > 0 else -1
+                moves.append(MoveAnalysis(pv[0], value, WIN_SCORE - abs(score) - pieces, pv, True))
+            elif pieces + len(pv) == self.geometry.cells:
+                moves.append(MoveAnalysis(pv[0], 0, len(pv), pv, True))
+            else:
+                moves.append(MoveAnalysis(pv[0], score, None, pv, False))
+        return Analysis(player, moves, self.nodes, self.horizon)
+
+    def analysis_negamax(self, mine: int, theirs: int, last_move: int, remaining: Optional[int],
+                         alpha: float, beta: float) -> Tuple[float, Tuple[int, ...]]:
+        """Score and principal variation for the side to move (mine)"""
+        self.nodes += 1
+        if not self.nodes & 255:
+            self.check_interrupt()
+        occupied = mine | theirs
+        if self.geometry.completes_line(theirs, last_move):
+            return -(WIN_SCORE - bin(occupied).count('1')), ()
+        if occupied == self.geometry.full_mask:
+            return 0, ()
+        if remaining == 0:
+            return self.evaluate(mine, theirs), ()
+
+        key = (mine, theirs, EXACT_DEPTH if remaining is None else remaining)
+        cached = self.analysis_table.get(key)
+        if cached is not None:
+            score, flag, pv = cached
+            if (flag == EXACT or (flag == LOWER and score >= beta)
+                    or (flag == UPPER and score <= alpha)):
+                return score, pv
+
+        rank = self.geometry.move_rank
+        moves = sorted(iter_bits(self.candidate_mask(occupied)), key=rank.__getitem__)
+        if cached is not None and cached[2] and cached[2][0] in moves:
+            moves.remove(cached[2][0])
+            moves.insert(0, cached[2][0])
+        original_alpha = alpha
+        best_score, best_pv = -WIN_SCORE - 1, ()
+        for i in moves:
+            score, pv = self.analysis_negamax(theirs, mine | (1 << i), i,
+                                              None if remaining is None else remaining - 1,
+                                              -beta, -alpha)
+            score = -score
+            if score > best_score:
+                best_score, best_pv = score, (i,) + pv
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.analysis_table.put(key, (best_score, flag, best_pv))
+        return best_score, best_pv
+
+    def search_root(self, board: Board, first_move: Optional[int] = None):
+        """Score every root move at the current horizon; returns (move, score)"""
+        ai_mask, human_mask = board.masks_for(self.ai_player)
+        candidates = self.candidate_mask(ai_mask | human_mask)
+        # Nothing beats winning on the spot
+        win = self.winning_move(ai_mask, candidates)
+        if win is not None:
+            completes_line = self.geometry.completes_line
+            self.root_moves = sum(1 << i for i in iter_bits(candidates)
+                                  if completes_line(ai_mask | (1 << i), i))
+            return win, self.win_score(bin(ai_mask | human_mask).count('1') + 1)
+        best_score = None
+        best_move = None
+        best_moves = 0
+
+        if self.mode == 'alphabeta':
+            moves = self.ordered_moves(candidates, 0, True)
+            if first_move in moves:
+                moves.remove(first_move)
+                moves.insert(0, first_move)
+            alpha = -2
+            for i in moves:
+                # The window opens just below the best score, so a move that ties it comes
+                # back exact and the lowest index can win, whatever the table holds
+                score = self.alphabeta(ai_mask | (1 << i), human_mask, i, 1, False,
+                                       alpha - TIE_MARGIN, 2)
+                if best_score is None or score > best_score + TIE_MARGIN:
+                    best_score = score
+                    best_move = i
+                    best_moves = 1 << i
+                    alpha = score
+                elif score >= best_score - TIE_MARGIN:
+                    best_move = min(best_move, i)
+                    best_moves |= 1 << i
+        else:
+            # Lowest index wins ties, as the original GUIs played
+            for i in iter_bits(candidates):
+                score = self.minimax(ai_mask | (1 << i), human_mask, i, 1, False)
+                if best_score is None or score > best_score:
+                    best_score = score
+                    best_move = i
+                    best_moves = 1 << i
+                elif score == best_score:
+                    best_moves |= 1 << i
+
+        self.root_moves = best_moves
+        return best_move, best_score
+
+    def check_interrupt(self):
+        """Abort the search when stopped or out of time (polled every 256 nodes)"""
+        if self.stop is not None and self.stop.is_set():
+            raise SearchCancelled()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+    def minimax(self, ai_mask: int, human_mask: int, last_move: int,
+                depth: int, is_maximizing: bool) -> float:
+        """Minimax score of a position from the computer's point of view"""
+        self.nodes += 1
+        if not self.nodes & 255:
+            self.check_interrupt()
+
+        terminal = self.terminal_score(ai_mask, human_mask, last_move, depth, is_maximizing)
+        if terminal is not None:
+            return terminal
+
+        remaining = self.remaining_depth(ai_mask | human_mask, depth)
+        key = self.position_key(ai_mask, human_mask, is_maximizing)
+        cached = self.table.get(key)
+        if cached is not None and cached[1] == EXACT and cached[2] == remaining:
+            return cached[0]
+
+        candidates = self.candidate_mask(ai_mask | human_mask)
+        immediate = self.immediate_win_score(ai_mask, human_mask, candidates, is_maximizing)
+        if immediate is not None:
+            return immediate
+        if is_maximizing:
+            score = -2
+            for i in iter_bits(candidates):
+                score = max(score, self.minimax(ai_mask | (1 << i), human_mask, i, depth + 1, False))
+        else:
+            score = 2
+            for i in iter_bits(candidates):
+                score = min(score, self.minimax(ai_mask, human_mask | (1 << i), i, depth + 1, True))
+
+        self.table.put(key, (score, EXACT, remaining))
+        return score
+
+    def alphabeta(self, ai_mask: int, human_mask: int, last_move: int, depth: int,
+                  is_maximizing: bool, alpha: float, beta: float) -> float:
+        """Fail-hard alpha-beta with bounded transposition entries"""
+        self.nodes += 1
+        if not self.nodes & 255:
+            self.check_interrupt()
+
+        terminal = self.terminal_score(ai_mask, human_mask, last_move, depth, is_maximizing)
+        if terminal is not None:
+            return terminal
+
+        remaining = self.remaining_depth(ai_mask | human_mask, depth)
+        key = self.position_key(ai_mask, human_mask, is_maximizing)
+        cached = self.table.get(key)
+        if cached is not None and cached[2] == remaining:
+            score, flag, _ = cached
+            if (flag == EXACT or (flag == LOWER and score >= beta)
+                    or (flag == UPPER and score <= alpha)):
+                return score
+
+        candidates = self.candidate_mask(ai_mask | human_mask)
+        immediate = self.immediate_win_score(ai_mask, human_mask, candidates, is_maximizing)
+        if immediate is not None:
+            return immediate
+        original_alpha, original_beta = alpha, beta
+        if is_maximizing:
+            score = -2
+            for i in self.ordered_moves(candidates, depth, True):
+                score = max(score, self.alphabeta(ai_mask | (1 << i), human_mask, i,
+                                                  depth + 1, False, alpha, beta))
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    self.record_cutoff(i, depth, True)
+                    break
+        else:
+            score = 2
+            for i in self.ordered_moves(candidates, depth, False):
+                score = min(score, self.alphabeta(ai_mask, human_mask | (1 << i), i,
+                                                  depth + 1, True, alpha, beta))
+                beta = min(beta, score)
+                if alpha >= beta:
+                    self.record_cutoff(i, depth, False)
+                    break
+
+        if score <= original_alpha:
+            flag = UPPER
+        elif score >= original_beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.put(key, (score, flag, remaining))
+        return score
+
+    def remaining_depth(self, occupied: int, depth: int) -> int:
+        """Plies still to search below a node, capped where the game must end
+
+        Table entries are only used at the depth they were searched to: a deeper entry
+        would make the result depend on what was searched before. Entries that reach the
+        end of the game hold the same value for any horizon, so they share the cap.
+        """
+        empty = self.geometry.cells - bin(occupied).count('1')
+        return empty if self.horizon is None else min(self.horizon - depth, empty)
+
+    def terminal_score(self, ai_mask: int, human_mask: int, last_move: int,
+                       depth: int, is_maximizing: bool) -> Optional[float]:
+        """Win, draw or depth-limit evaluation; None if the search must go deeper"""
+        # Only the player who just moved can have completed a line, through last_move
+        if is_maximizing:
+            if self.geometry.completes_line(human_mask, last_move):
+                return -self.win_score(bin(ai_mask | human_mask).count('1'))
+        elif self.geometry.completes_line(ai_mask, last_move):
+            return self.win_score(bin(ai_mask | human_mask).count('1'))
+        if ai_mask | human_mask == self.geometry.full_mask:
+            return 0
+        if self.horizon is not None and depth >= self.horizon:
+            return self.evaluate(ai_mask, human_mask)
+        return None
+
+    def win_score(self, pieces: int) -> float:
+        """Score of a win with pieces on the board, in (1, 2): the sooner, the higher
+
+        It depends only on the final position, never on the path or the search root, so
+        transposition entries stay comparable; losses score the negative.
+        """
+        cells = self.geometry.cells
+        return 1 + (cells - pieces) / cells
+
+    def win_plies(self, score: float, board: Board) -> int:
+        """Plies from board to the end of the game a forced win or loss score stands for"""
+        cells = self.geometry.cells
+        pieces = cells - round((abs(score) - 1) * cells)
+        return pieces - bin(board.x_mask | board.o_mask).count('1')
+
+    def winning_move(self, mask: int, candidates: int) -> Optional[int]:
+        """A candidate cell that completes a line for mask, if any"""
+        if bin(mask).count('1') < self.geometry.win_length - 1:
+            return None
+        completes_line = self.geometry.completes_line
+        for i in iter_bits(candidates):
+            if completes_line(mask | (1 << i), i):
+                return i
+        return None
+
+    def immediate_win_score(self, ai_mask: int, human_mask: int, candidates: int,
+                            is_maximizing: bool) -> Optional[float]:
+        """Exact score when the side to move can win at once, without searching further"""
+        mover = ai_mask if is_maximizing else human_mask
+        if self.winning_move(mover, candidates) is None:
+            return None
+        score = self.win_score(bin(ai_mask | human_mask).count('1') + 1)
+        return score if is_maximizing else -score
+
+    def evaluate(self, ai_mask: int, human_mask: int) -> float:
+        """Heuristic score in (-1, 1): open lines weighted by how full they are"""
+        score = 0
+        for line in self.geometry.line_masks:
+            ai_part = ai_mask & line
+            human_part = human_mask & line
+            if ai_part:
+                if not human_part:
+                    score += LINE_WEIGHTS[bin(ai_part).count('1')]
+            elif human_part:
+                score -= LINE_WEIGHTS[bin(human_part).count('1')]
+        return score / (abs(score) + EVAL_SCALE)
+
+    def candidate_mask(self, occupied: int) -> int:
+        """Moves worth searching: every empty cell, or only those near pieces on big boards"""
+        geometry = self.geometry
+        empty = geometry.full_mask & ~occupied
+        if geometry.cells <= LOCAL_MOVES_ABOVE:
+            return empty
+        if not occupied:
+            return 1 << geometry.center
+        near = 0
+        for i in iter_bits(occupied):
+            near |= geometry.neighbours[i]
+        return near & empty
+
+    def position_key(self, ai_mask: int, human_mask: int, is_maximizing: bool) -> int:
+        """Transposition key, shared by all 8 symmetric variants of a position"""
+        if self.symmetry is not None:
+            ai_mask, human_mask, _ = self.symmetry.canonical(ai_mask, human_mask)
+        shift = self.geometry.cells + 1
+        return (ai_mask << shift) | (human_mask << 1) | is_maximizing
+
+    def ordered_moves(self, candidates: int, depth: int, is_maximizing: bool) -> List[int]:
+        """Killers first, then history score, then cells on the most lines"""
+        killers = self.killers[depth] if depth < len(self.killers) else []
+        history = self.history[is_maximizing]
+        rank = self.geometry.move_rank
+        return sorted(
+            iter_bits(candidates),
+            key=lambda i: (i not in killers, -history[i], rank[i])
+        )
+
+    def record_cutoff(self, move: int, depth: int, is_maximizing: bool):
+        """Remember a move that caused a beta cutoff"""
+        self.cutoffs += 1
+        killers = self.killers[depth]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        remaining = self.geometry.cells - depth
+        self.history[is_maximizing][move] += remaining * remaining
+
+    def stats(self) -> Dict[str, int]:
+        """Transposition table counters, nodes visited and cutoffs of the last search"""
+        stats = self.table.stats()
+        stats['nodes'] = self.nodes
+        stats['cutoffs'] = self.cutoffs
+        if self.shared_cache is not None:
+            stats.update(self.shared_cache.stats())
+        return stats
+
+    def trace_counters(self):
+        """Emit the last search's counters to an active trace"""
+        if instrument.enabled():
+            instrument.counter('search', **self.stats())
+
+
+class EnginePool:
+    """Re-entrant move search over immutable positions, for thread pools and servers
+
+    Every call checks out an idle engine for the side to move, the board and the
+    difficulty, creating one when all are busy, and returns it afterwards. Concurrent
+    callers therefore never share search state, while later calls still reuse the warm
+    transposition tables. Difficulties keep engines of their own, since entries searched
+    deeper would let a depth-limited level play above its depth.
+    The tablebase and shared cache are read-safe and common to all engines.
+
+    Ties go to the lowest cell index, so whichever engine serves a call, searches that
+    finish within their budget return the same move. A search cut short by its time
+    budget depends on how far it got and is only as good as that depth.
+    """
+
+    def __init__(self, mode: str = 'alphabeta', tablebase: Optional['Tablebase'] = None,
+                 shared_cache: Optional[SharedPositionCache] = None):
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        self.mode = mode
+        self.tablebase = tablebase
+        self.shared_cache = shared_cache
+        self.idle: Dict[Tuple[str, int, int, Optional[str]], List[SearchEngine]] = {}
+        self.created = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def engine(self, player: str, geometry: Geometry,
+               difficulty: Optional[str] = None) -> Iterator[SearchEngine]:
+        """Engine playing player on a board at a difficulty, for the caller's exclusive use
+
+        difficulty None is for analysis, which only uses the engine's analysis table.
+        """
+        key = (player, geometry.size, geometry.win_length, difficulty)
+        with self.lock:
+            idle = self.idle.get(key)
+            engine = idle.pop() if idle else None
+            if engine is None:
+                self.created += 1
+        if engine is None:
+            engine = SearchEngine(ai_player=player, human_player='O' if player == 'X' else 'X',
+                                  mode=self.mode, tablebase=self.tablebase,
+                                  shared_cache=self.shared_cache)
+        try:
+            yield engine
+        finally:
+            with self.lock:
+                self.idle.setdefault(key, []).append(engine)
+
+    def search(self, position: Union[Position, Board], difficulty: str = 'hard',
+               stop: Optional[threading.Event] = None) -> SearchResult:
+        """Move for the side to move within a difficulty's budget; no move once the game is over"""
+        budget = DIFFICULTY_BUDGETS.get(difficulty)
+        if budget is None:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        if isinstance(position, Board):
+            position = position.position()
+        if position.winner() is not None:
+            return SearchResult(None, None, 0, 0)
+        with self.engine(position.to_move, position.geometry, difficulty) as engine:
+            return engine.think(position, budget.time_ms, budget.max_depth, stop)
+
+    def best_move(self, position: Union[Position, Board], difficulty: str = 'hard',
+                  stop: Optional[threading.Event] = None) -> Optional[int]:
+        return self.search(position, difficulty, stop).move
+
+    def analyze(self, position: Union[Position, Board],
+                stop: Optional[threading.Event] = None) -> Analysis:
+        """Every legal move of the position with its value and principal variation"""
+        if isinstance(position, Board):
+            position = position.position()
+        with self.engine(position.to_move, position.geometry) as engine:
+            return engine.analyze(position, stop)
+
+    def stats(self) -> Dict[str, int]:
+        """Engines created so far and how many are idle"""
+        with self.lock:
+            return {
+                'engines': self.created,
+                'idle': sum(len(engines) for engines in self.idle.values())
+            }
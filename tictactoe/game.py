@@ -0,0 +1,175 @@
+"""
+Headless game core
+Board, turn order, results and scores with no Tk dependency, shared by both front ends,
+plus fast bulk simulation for running large numbers of games without a display.
+
+Simulate from the command line with:
+    python -m tictactoe.game --games 1000000 [--size 3 --win-length 3 --seed 1]
+"""
+
+import argparse
+import random
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from . import instrument
+from .board import Board, Geometry, geometry_for
+
+if TYPE_CHECKING:
+    from .record import RecordWriter
+
+Agent = Callable[[Board], Optional[int]]
+
+
+def new_scores() -> Dict[str, int]:
+    """Empty X / O / tie tally"""
+    return {'X': 0, 'O': 0, 'tie': 0}
+
+
+def integer_field(request: Dict, name: str, default: Optional[int] = None) -> Optional[int]:
+    """A request field that must be a JSON integer (booleans are not); default if absent"""
+    value = request.get(name, default)
+    if value is None:
+        return default
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    return value
+
+
+class Game:
+    """One match: current round's board and turn, plus running scores
+
+    With a recorder, every move is streamed to it; difficulty and seed are written
+    in each game's header.
+    """
+
+    def __init__(self, size: int = 3, win_length: Optional[int] = None,
+                 recorder: Optional['RecordWriter'] = None):
+        self.geometry: Geometry = geometry_for(size, win_length)
+        self.scores = new_scores()
+        self.recorder = recorder
+        self.difficulty = ''
+        self.seed = 0
+        self.moves: List[int] = []
+        self.game_over = False
+        self.winner: Optional[str] = None
+        self.reset()
+
+    def reset(self, size: Optional[int] = None, win_length: Optional[int] = None):
+        """Start a new round, optionally on another board; scores are kept"""
+        if self.recorder is not None and self.moves and not self.game_over:
+            self.recorder.end_game(None)
+        if size is not None:
+            self.geometry = geometry_for(size, win_length)
+        self.board = Board(size=self.geometry.size, win_length=self.geometry.win_length)
+        self.current_player = 'X'
+        self.game_over = False
+        self.winner = None
+        self.moves = []
+
+    def new_match(self):
+        """Clear the scores and start a new round"""
+        self.scores = new_scores()
+        self.reset()
+
+    def is_legal(self, index: int) -> bool:
+        """True if the current player may play on index"""
+        return (not self.game_over and 0 <= index < self.geometry.cells
+                and self.board[index] == '')
+
+    @instrument.traced('make_move', 'game')
+    def make_move(self, index: int) -> Optional[str]:
+        """Play for the current player; returns 'X', 'O' or 'tie' when the round ends"""
+        if not self.is_legal(index):
+            raise ValueError(f"Illegal move: {index}")
+        self.board[index] = self.current_player
+        if self.recorder is not None:
+            if not self.moves:
+                self.recorder.begin_game(self.geometry.size, self.geometry.win_length,
+                                         self.difficulty, self.seed)
+            self.recorder.add_move(index)
+        self.moves.append(index)
+
+        winner = self.check_winner()
+        if winner:
+            self.game_over = True
+            self.winner = winner
+            self.scores[winner] += 1
+            if self.recorder is not None:
+                self.recorder.end_game(winner)
+            return winner
+
+        self.current_player = 'O' if self.current_player == 'X' else 'X'
+        return None
+
+    @instrument.traced('check_winner', 'game')
+    def check_winner(self) -> Optional[str]:
+        """Return 'X', 'O', 'tie' or None"""
+        return self.board.winner()
+
+    def empty_cells(self) -> List[int]:
+        """Indices of the empty cells"""
+        return self.board.empty_cells()
+
+
+def play_game(x_agent: Agent, o_agent: Agent, size: int = 3,
+              win_length: Optional[int] = None) -> Game:
+    """Play one round between two agents (board -> move) and return the finished game"""
+    game = Game(size, win_length)
+    agents = {'X': x_agent, 'O': o_agent}
+    while not game.game_over:
+        move = agents[game.current_player](game.board.copy())
+        if move is None:
+            break
+        game.make_move(move)
+    return game
+
+
+def simulate_random_games(count: int, size: int = 3, win_length: Optional[int] = None,
+                          seed: Optional[int] = None) -> Dict[str, int]:
+    """Play count uniformly random games on raw bitmasks and tally the results"""
+    geometry = geometry_for(size, win_length)
+    lines_through = geometry.lines_through
+    cells = list(range(geometry.cells))
+    shuffle = random.Random(seed).shuffle
+    results = new_scores()
+
+    for _ in range(count):
+        shuffle(cells)
+        masks = [0, 0]
+        winner = 'tie'
+        for ply, move in enumerate(cells):
+            side = ply & 1
+            mask = masks[side] | (1 << move)
+            masks[side] = mask
+            for line in lines_through[move]:
+                if mask & line == line:
+                    winner = 'O' if side else 'X'
+                    break
+            else:
+                continue
+            break
+        results[winner] += 1
+
+    return results
+
+
+def main():
+    """Command-line entry point for bulk random simulation"""
+    parser = argparse.ArgumentParser(description="Simulate random Tic Tac Toe games headlessly")
+    parser.add_argument('--games', type=int, default=100000, help="Number of games to play")
+    parser.add_argument('--size', type=int, default=3, help="Board size")
+    parser.add_argument('--win-length', type=int, default=None, help="Pieces in a row to win")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = simulate_random_games(args.games, args.size, args.win_length, args.seed)
+    elapsed = time.perf_counter() - started
+    rate = args.games / elapsed if elapsed > 0 else float('inf')
+    print(f"X {results['X']}  O {results['O']}  tie {results['tie']}")
+    print(f"{args.games} games in {elapsed:.2f}s ({rate:,.0f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
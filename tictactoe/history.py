@@ -0,0 +1,195 @@
+"""
+Persistent match history
+Finished games are written to a local SQLite database by a background thread in batches,
+so recording a result never blocks the UI. Running totals per board, difficulty and
+winner are kept in their own table, making aggregate stats a small keyed lookup.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.tictactoe', 'history.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    board TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    plies INTEGER NOT NULL,
+    moves BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_difficulty ON games (board, difficulty, winner);
+CREATE INDEX IF NOT EXISTS games_by_time ON games (played_at);
+CREATE TABLE IF NOT EXISTS totals (
+    board TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (board, difficulty, winner)
+) WITHOUT ROWID;
+"""
+
+INSERT_GAME = ("INSERT INTO games (played_at, board, difficulty, winner, plies, moves) "
+               "VALUES (?, ?, ?, ?, ?, ?)")
+BUMP_TOTAL = ("INSERT INTO totals (board, difficulty, winner, games) VALUES (?, ?, ?, 1) "
+              "ON CONFLICT (board, difficulty, winner) DO UPDATE SET games = games + 1")
+
+# Games written per transaction at most
+BATCH_SIZE = 256
+
+
+class GameRecord(NamedTuple):
+    """One finished game"""
+    played_at: float
+    board: str          # Geometry label, e.g. '5x5 (4 in a row)'
+    difficulty: str
+    winner: str         # 'X', 'O' or 'tie'
+    moves: Tuple[int, ...]
+
+
+class MatchStats(NamedTuple):
+    """Totals for one board and difficulty"""
+    games: int
+    x_wins: int
+    o_wins: int
+    ties: int
+
+    @property
+    def x_win_rate(self) -> float:
+        return self.x_wins / self.games if self.games else 0.0
+
+
+class MatchStore:
+    """SQLite-backed game history with an asynchronous, batching writer
+
+    The database is opened on first use; if it cannot be created the store stays
+    unavailable and records are dropped, so the game itself is never affected.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, batch_size: int = BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.available: Optional[bool] = None
+        self.reader: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+        self.pending: 'queue.Queue[Optional[GameRecord]]' = queue.Queue()
+        self.writer: Optional[threading.Thread] = None
+        # (board, difficulty) -> {'X': n, 'O': n, 'tie': n}, kept current by record()
+        self.totals: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+    def open(self) -> bool:
+        """Create the database and start the writer; False if that is not possible"""
+        if self.available is not None:
+            return self.available
+        self.available = False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            reader = sqlite3.connect(self.path, check_same_thread=False)
+            reader.execute("PRAGMA journal_mode=WAL")
+            reader.executescript(SCHEMA)
+            rows = reader.execute("SELECT board, difficulty, winner, games FROM totals").fetchall()
+        except (OSError, sqlite3.Error):
+            return False
+
+        for board, difficulty, winner, games in rows:
+            self.totals.setdefault((board, difficulty), {'X': 0, 'O': 0, 'tie': 0})[winner] = games
+        self.reader = reader
+        self.writer = threading.Thread(target=self.write_loop, name='match-history', daemon=True)
+        self.writer.start()
+        self.available = True
+        return True
+
+    def record(self, winner: str, difficulty: str, board: str, moves: Sequence[int]):
+        """Queue a finished game for writing and count it in the totals immediately"""
+        if not self.open():
+            return
+        totals = self.totals.setdefault((board, difficulty), {'X': 0, 'O': 0, 'tie': 0})
+        totals[winner] += 1
+        self.pending.put(GameRecord(time.time(), board, difficulty, winner, tuple(moves)))
+
+    def write_loop(self):
+        """Writer thread: drain the queue in batches, one transaction per batch"""
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [record for record in batch if record is not None]
+            running = len(records) == len(batch)
+            try:
+                with connection:
+                    connection.executemany(INSERT_GAME, [
+                        (record.played_at, record.board, record.difficulty, record.winner,
+                         len(record.moves), bytes(record.moves))
+                        for record in records
+                    ])
+                    connection.executemany(BUMP_TOTAL, [
+                        (record.board, record.difficulty, record.winner) for record in records
+                    ])
+            except sqlite3.Error:
+                pass
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+        connection.close()
+
+    def flush(self):
+        """Block until every queued game is written"""
+        if self.available:
+            self.pending.join()
+
+    def close(self):
+        """Write what is queued and stop the writer"""
+        if not self.available:
+            return
+        self.pending.put(None)
+        self.writer.join()
+        with self.lock:
+            self.reader.close()
+        self.available = None
+        self.reader = None
+        self.writer = None
+
+    def stats(self, board: str, difficulty: str) -> MatchStats:
+        """Totals for a board and difficulty, including games not yet written"""
+        self.open()
+        totals = self.totals.get((board, difficulty), {'X': 0, 'O': 0, 'tie': 0})
+        return MatchStats(sum(totals.values()), totals['X'], totals['O'], totals['tie'])
+
+    def recent(self, limit: int = 20, board: Optional[str] = None,
+               difficulty: Optional[str] = None) -> List[GameRecord]:
+        """Most recent games, newest first, optionally only for a board and/or difficulty"""
+        if not self.open():
+            return []
+        self.flush()
+        query = "SELECT played_at, board, difficulty, winner, moves FROM games"
+        conditions = []
+        args: list = []
+        if board is not None:
+            conditions.append("board = ?")
+            args.append(board)
+        if difficulty is not None:
+            conditions.append("difficulty = ?")
+            args.append(difficulty)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY played_at DESC LIMIT ?"
+        args.append(limit)
+        with self.lock:
+            rows = self.reader.execute(query, args).fetchall()
+        return [GameRecord(played_at, board_label, level, winner, tuple(moves))
+                for played_at, board_label, level, winner, moves in rows]
@@ -0,0 +1,250 @@
+"""
+Opt-in instrumentation
+Timed spans for searches, move application, winner checks and the UI update phases,
+plus search counters, written as a Chrome trace (chrome://tracing, Perfetto) or a
+speedscope file. Functions marked with traced() are only wrapped when tracing was
+enabled before they were defined, so they cost nothing otherwise; span() hands back one
+shared no-op context manager while tracing is off.
+
+Enable for any entry point with an environment variable; the trace is written at exit:
+    TICTACTOE_TRACE=moves.json python tic_tac_toe_kv_v1.2.9.py
+Paths ending in .speedscope.json get the speedscope format; tictactoe.traces summarizes
+and converts Chrome traces.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+ENV_VAR = 'TICTACTOE_TRACE'
+
+# Shared no-op returned by span() while tracing is off
+NULL_SPAN = nullcontext()
+
+
+class SpanEvent(NamedTuple):
+    """One finished span; times in nanoseconds from perf_counter_ns()"""
+    name: str
+    category: str
+    start: int
+    end: int
+    thread: int
+    args: Optional[Dict[str, Any]]
+
+
+class CounterEvent(NamedTuple):
+    """Values of a group of counters at one moment"""
+    name: str
+    time: int
+    values: Dict[str, float]
+
+
+class Span:
+    """Context manager timing one span into a Tracer"""
+
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.spans.append(SpanEvent(self.name, self.category, self.start,
+                                           time.perf_counter_ns(), threading.get_ident(), self.args))
+        return False
+
+
+class Tracer:
+    """Collected spans and counters of one tracing session"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.origin = time.perf_counter_ns()
+        self.spans: List[SpanEvent] = []
+        self.counters: List[CounterEvent] = []
+        self.thread_names: Dict[int, str] = {}
+
+    def span(self, name: str, category: str, args: Optional[Dict[str, Any]] = None) -> Span:
+        self.thread_names.setdefault(threading.get_ident(), threading.current_thread().name)
+        return Span(self, name, category, args)
+
+    def add_span(self, name: str, category: str, start: int, end: int,
+                 args: Optional[Dict[str, Any]] = None):
+        """Record a span measured elsewhere, such as a wait in the Tk event queue"""
+        self.thread_names.setdefault(threading.get_ident(), threading.current_thread().name)
+        self.spans.append(SpanEvent(name, category, start, end, threading.get_ident(), args))
+
+    def counter(self, name: str, values: Dict[str, float]):
+        self.counters.append(CounterEvent(name, time.perf_counter_ns(), values))
+
+    def chrome_trace(self) -> Dict:
+        """Trace Event Format document"""
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread, 'args': {'name': name}}
+            for thread, name in self.thread_names.items()
+        ]
+        for span in self.spans:
+            event = {'name': span.name, 'cat': span.category, 'ph': 'X', 'pid': pid,
+                     'tid': span.thread, 'ts': (span.start - self.origin) / 1000,
+                     'dur': (span.end - span.start) / 1000}
+            if span.args:
+                event['args'] = span.args
+            events.append(event)
+        for counter in self.counters:
+            events.append({'name': counter.name, 'ph': 'C', 'pid': pid, 'tid': 0,
+                           'ts': (counter.time - self.origin) / 1000, 'args': counter.values})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def speedscope(self) -> Dict:
+        """speedscope evented profile, one per thread"""
+        frames: List[Dict[str, str]] = []
+        frame_index: Dict[str, int] = {}
+        by_thread: Dict[int, List[SpanEvent]] = {}
+        for span in self.spans:
+            by_thread.setdefault(span.thread, []).append(span)
+            if span.name not in frame_index:
+                frame_index[span.name] = len(frames)
+                frames.append({'name': span.name})
+
+        profiles = []
+        for thread, spans in by_thread.items():
+            # Parents start no later and end no earlier than their children
+            spans.sort(key=lambda span: (span.start, -span.end))
+            events: List[Dict[str, Any]] = []
+            stack: List[SpanEvent] = []
+            for span in spans:
+                while stack and stack[-1].end <= span.start:
+                    closed = stack.pop()
+                    events.append({'type': 'C', 'frame': frame_index[closed.name],
+                                   'at': closed.end - self.origin})
+                # Clamp spans recorded out of line (add_span) into their parent
+                end = min(span.end, stack[-1].end) if stack else span.end
+                span = span._replace(end=end)
+                events.append({'type': 'O', 'frame': frame_index[span.name],
+                               'at': span.start - self.origin})
+                stack.append(span)
+            while stack:
+                closed = stack.pop()
+                events.append({'type': 'C', 'frame': frame_index[closed.name],
+                               'at': closed.end - self.origin})
+            profiles.append({
+                'type': 'evented',
+                'name': self.thread_names.get(thread, str(thread)),
+                'unit': 'nanoseconds',
+                'startValue': spans[0].start - self.origin,
+                'endValue': max(span.end for span in spans) - self.origin,
+                'events': events
+            })
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': profiles,
+            'name': 'tictactoe',
+            'exporter': 'tictactoe.instrument'
+        }
+
+    def write(self, path: Optional[str] = None):
+        """Write the trace; speedscope for *.speedscope.json, Chrome trace otherwise"""
+        path = path or self.path
+        if not path:
+            return
+        document = self.speedscope() if path.endswith('.speedscope.json') else self.chrome_trace()
+        with open(path, 'w') as handle:
+            json.dump(document, handle, separators=(',', ':'))
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable(path: Optional[str] = None) -> Tracer:
+    """Start a tracing session; with path, the trace is also written at exit"""
+    global _tracer
+    _tracer = Tracer(path)
+    if path:
+        atexit.register(_tracer.write)
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop tracing and return the finished session"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, category: str = 'app', **args):
+    """Time a with-block while tracing is on"""
+    if _tracer is None:
+        return NULL_SPAN
+    return _tracer.span(name, category, args or None)
+
+
+def add_span(name: str, category: str, start: int, end: int, **args):
+    """Record a span measured by the caller (perf_counter_ns() times) while tracing is on"""
+    if _tracer is not None:
+        _tracer.add_span(name, category, start, end, args or None)
+
+
+def counter(name: str, **values: float):
+    """Record counter values while tracing is on"""
+    if _tracer is not None:
+        _tracer.counter(name, values)
+
+
+def traced(name: str, category: str = 'app'):
+    """Decorator timing every call of a function while tracing is on
+
+    Without an active trace at definition time (normally TICTACTOE_TRACE unset) the
+    function is returned unwrapped.
+    """
+    def decorate(function: Callable) -> Callable:
+        if _tracer is None:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return function(*args, **kwargs)
+            with _tracer.span(name, category, None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def after(window, delay_ms: int, callback: Callable[[], Any], name: str):
+    """window.after() that, while tracing, also records the callback's wait in the Tk queue"""
+    if _tracer is None:
+        return window.after(delay_ms, callback)
+    due = time.perf_counter_ns() + delay_ms * 1_000_000
+
+    def run():
+        tracer = _tracer
+        if tracer is None:
+            return callback()
+        now = time.perf_counter_ns()
+        tracer.add_span('tk_queue', 'tk', min(due, now), now, {'callback': name})
+        with tracer.span(name, 'ui', None):
+            return callback()
+    return window.after(delay_ms, run)
+
+
+# Tracing requested from the environment covers the whole process
+if os.environ.get(ENV_VAR):
+    enable(os.environ[ENV_VAR])
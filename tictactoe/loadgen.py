@@ -0,0 +1,112 @@
+"""
+Load generator for the game server
+Opens many concurrent client connections, each playing complete games against the
+server's computer player with random legal moves, and reports throughput and latency.
+
+Run against a running server with:
+    python -m tictactoe.loadgen [--clients 200] [--games 5] [--difficulty easy]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from .bench import latency_summary
+from .server import DEFAULT_HOST, DEFAULT_PORT
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                  message: Dict) -> Dict:
+    """Send one request and wait for its reply, skipping pushed events"""
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        reply = json.loads(line)
+        if 'event' not in reply:
+            return reply
+
+
+async def run_client(host: str, port: int, games: int, difficulty: str, size: int,
+                     win_length: Optional[int], rng: random.Random,
+                     latencies: List[float], totals: Dict[str, int]):
+    """Play games sequentially over one connection"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(games):
+            state = await request(reader, writer, {
+                'op': 'new', 'mode': 'ai', 'difficulty': difficulty,
+                'size': size, 'win_length': win_length
+            })
+            if not state.get('ok'):
+                totals['errors'] += 1
+                continue
+            totals['sessions'] += 1
+            session = state['session']
+            while state.get('ok') and state['winner'] is None:
+                empty = [i for i, cell in enumerate(state['board']) if cell == '']
+                started = time.perf_counter()
+                state = await request(reader, writer, {
+                    'op': 'move', 'session': session, 'index': rng.choice(empty)
+                })
+                latencies.append((time.perf_counter() - started) * 1000)
+                if not state.get('ok'):
+                    totals['errors'] += 1
+                    break
+                totals['moves'] += 1 + (state['ai_move'] is not None)
+            await request(reader, writer, {'op': 'close', 'session': session})
+    finally:
+        writer.close()
+
+
+async def generate_load(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                        clients: int = 100, games: int = 5, difficulty: str = 'easy',
+                        size: int = 3, win_length: Optional[int] = None,
+                        seed: int = 0) -> Dict:
+    """Run all clients concurrently and summarize"""
+    latencies: List[float] = []
+    totals = {'sessions': 0, 'moves': 0, 'errors': 0}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(host, port, games, difficulty, size, win_length,
+                   random.Random(seed * 100003 + client), latencies, totals)
+        for client in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        'clients': clients,
+        'seconds': round(elapsed, 3),
+        'sessions_per_second': round(totals['sessions'] / elapsed, 1),
+        'moves_per_second': round(totals['moves'] / elapsed, 1),
+        'move_latency_ms': {name: round(value, 2)
+                            for name, value in latency_summary(latencies).items()}
+        if latencies else None,
+        **totals
+    }
+
+
+def main():
+    """Command-line entry point for load generation"""
+    parser = argparse.ArgumentParser(description="Load-test the Tic Tac Toe game server")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Server address")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Server port")
+    parser.add_argument('--clients', type=int, default=100, help="Concurrent connections")
+    parser.add_argument('--games', type=int, default=5, help="Games per connection")
+    parser.add_argument('--difficulty', default='easy', help="Computer difficulty")
+    parser.add_argument('--size', type=int, default=3, help="Board size")
+    parser.add_argument('--win-length', type=int, default=None, help="Pieces in a row to win")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the clients' moves")
+    args = parser.parse_args()
+
+    report = asyncio.run(generate_load(args.host, args.port, args.clients, args.games,
+                                       args.difficulty, args.size, args.win_length, args.seed))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Monte Carlo Tree Search (UCT) engine
+An alternative to minimax whose strength is set by playout count and time, not depth.
+The tree is kept between moves of a game and re-rooted at the current position.
+"""
+
+import math
+import random
+import threading
+import time
+from typing import List, Optional, Sequence
+
+from .board import Board, Geometry, iter_bits, side_to_move
+from .engine import SearchCancelled, SearchResult
+
+# Exploration constant of the UCB1 formula
+EXPLORATION = 1.4
+
+# Default playout allowance per move
+DEFAULT_PLAYOUTS = 2000
+
+# Playouts per difficulty level, for callers that want MCTS-calibrated strength
+DIFFICULTY_PLAYOUTS = {
+    'easy': 30,
+    'medium': 300,
+    'hard': 5000
+}
+
+
+class Node:
+    """One position in the search tree; wins are counted for the player who just moved"""
+
+    __slots__ = ('x_mask', 'o_mask', 'move', 'mover', 'parent', 'children',
+                 'untried', 'visits', 'wins', 'winner')
+
+    def __init__(self, x_mask: int, o_mask: int, move: Optional[int], mover: str,
+                 parent: Optional['Node'], untried: List[int], winner: Optional[str]):
+        self.x_mask = x_mask
+        self.o_mask = o_mask
+        self.move = move
+        self.mover = mover
+        self.parent = parent
+        self.children: List['Node'] = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.winner = winner    # 'X', 'O', 'tie' or None while the game goes on
+
+    @property
+    def to_move(self) -> str:
+        """Player whose turn it is in this position"""
+        return 'O' if self.mover == 'X' else 'X'
+
+    def best_child(self, exploration: float) -> 'Node':
+        """Child with the highest UCB1 value"""
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.wins / child.visits
+            + exploration * math.sqrt(log_visits / child.visits)
+        )
+
+
+class MCTSEngine:
+    """UCT search with random rollouts, reusing its tree between consecutive moves"""
+
+    def __init__(self, playouts: int = DEFAULT_PLAYOUTS, time_ms: Optional[float] = None,
+                 exploration: float = EXPLORATION, seed: Optional[int] = None,
+                 reuse_tree: bool = True):
+        self.playouts = playouts
+        self.time_ms = time_ms
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.reuse_tree = reuse_tree
+        self.root: Optional[Node] = None
+        self.geometry: Optional[Geometry] = None
+        self.reused_visits = 0
+        self.last_result: Optional[SearchResult] = None
+
+    def best_move(self, board: Sequence[str], stop: Optional[threading.Event] = None) -> Optional[int]:
+        """Pick the most visited move for the side to move"""
+        return self.search(board, stop).move
+
+    def search(self, board: Sequence[str], stop: Optional[threading.Event] = None) -> SearchResult:
+        """Search with the engine's default playout and time limits"""
+        return self.think(board, self.time_ms, self.playouts, stop)
+
+    def think(self, board: Sequence[str], time_ms: Optional[float] = None,
+              playouts: Optional[int] = None,
+              stop: Optional[threading.Event] = None) -> SearchResult:
+        """Run playouts until either limit is reached; score is the win rate mapped to [-1, 1]"""
+        if not isinstance(board, Board):
+            board = Board(board)
+        if board.winner() is not None:
+            return SearchResult(None, None, 0)
+        root = self.find_root(board)
+        self.root = root
+
+        # Take an immediate win without searching
+        mover_mask = board.x_mask if root.to_move == 'X' else board.o_mask
+        for i in iter_bits(board.empty_mask()):
+            if board.geometry.completes_line(mover_mask | (1 << i), i):
+                self.last_result = SearchResult(i, 1.0, 0)
+                return self.last_result
+
+        limit = playouts if playouts is not None else (None if time_ms is not None else self.playouts)
+        deadline = time.perf_counter() + time_ms / 1000.0 if time_ms is not None else None
+        count = 0
+        while limit is None or count < limit:
+            if not count & 63:
+                if stop is not None and stop.is_set():
+                    raise SearchCancelled()
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+            self.playout(root)
+            count += 1
+
+        if not root.children:
+            moves = list(iter_bits(board.empty_mask()))
+            self.last_result = SearchResult(moves[0] if moves else None, None, count)
+            return self.last_result
+        best = max(root.children, key=lambda child: child.visits)
+        self.last_result = SearchResult(best.move, 2.0 * best.wins / best.visits - 1.0, count)
+        return self.last_result
+
+    def find_root(self, board: Board) -> Node:
+        """Reuse the subtree for this position if the last search reached it"""
+        self.reused_visits = 0
+        if self.reuse_tree and self.root is not None and self.geometry is board.geometry:
+            frontier = [self.root]
+            # The position is usually the old root, a child, or a grandchild
+            for _ in range(3):
+                next_frontier = []
+                for node in frontier:
+                    if node.x_mask == board.x_mask and node.o_mask == board.o_mask:
+                        node.parent = None
+                        self.reused_visits = node.visits
+                        return node
+                    next_frontier.extend(node.children)
+                frontier = next_frontier
+
+        self.geometry = board.geometry
+        previous = 'O' if side_to_move(board.x_mask, board.o_mask) == 'X' else 'X'
+        return Node(board.x_mask, board.o_mask, None, previous, None,
+                    self.shuffled(board.empty_mask()), None)
+
+    def shuffled(self, mask: int) -> List[int]:
+        """Empty cells in random order, so expansion pops a random move"""
+        cells = list(iter_bits(mask))
+        self.rng.shuffle(cells)
+        return cells
+
+    def playout(self, root: Node):
+        """Select, expand, simulate and back-propagate once"""
+        node = root
+        while not node.untried and node.children and node.winner is None:
+            node = node.best_child(self.exploration)
+
+        if node.untried and node.winner is None:
+            node = self.expand(node)
+
+        winner = node.winner if node.winner is not None else self.rollout(node)
+
+        while node is not None:
+            node.visits += 1
+            if winner == node.mover:
+                node.wins += 1.0
+            elif winner == 'tie':
+                node.wins += 0.5
+            node = node.parent
+
+    def expand(self, node: Node) -> Node:
+        """Add one untried move as a new child"""
+        move = node.untried.pop()
+        mover = node.to_move
+        bit = 1 << move
+        x_mask, o_mask = node.x_mask, node.o_mask
+        if mover == 'X':
+            x_mask |= bit
+            mask = x_mask
+        else:
+            o_mask |= bit
+            mask = o_mask
+
+        geometry = self.geometry
+        if geometry.completes_line(mask, move):
+            winner = mover
+        elif x_mask | o_mask == geometry.full_mask:
+            winner = 'tie'
+        else:
+            winner = None
+
+        empty = geometry.full_mask & ~(x_mask | o_mask)
+        child = Node(x_mask, o_mask, move, mover, node,
+                     self.shuffled(empty) if winner is None else [], winner)
+        node.children.append(child)
+        return child
+
+    def rollout(self, node: Node) -> str:
+        """Play uniformly random moves to the end; returns 'X', 'O' or 'tie'"""
+        geometry = self.geometry
+        masks = {'X': node.x_mask, 'O': node.o_mask}
+        mover = node.mover
+        cells = list(iter_bits(geometry.full_mask & ~(node.x_mask | node.o_mask)))
+        self.rng.shuffle(cells)
+        for move in cells:
+            mover = 'O' if mover == 'X' else 'X'
+            mask = masks[mover] | (1 << move)
+            masks[mover] = mask
+            if geometry.completes_line(mask, move):
+                return mover
+        return 'tie'
+
+    def stats(self):
+        """Tree counters for inspection"""
+        return {
+            'root_visits': self.root.visits if self.root is not None else 0,
+            'reused_visits': self.reused_visits,
+            'root_children': len(self.root.children) if self.root is not None else 0
+        }
@@ -0,0 +1,211 @@
+"""
+Compact binary game records
+A record file is a short file header followed by games, each a fixed header (board size,
+win length, difficulty, engine version, seed), one byte per move, an end marker and
+the result. Games are appended as they are played and read back with a generator in
+constant memory, however large the archive.
+
+Summarize an archive with:
+    python -m tictactoe.record PATH
+"""
+
+import argparse
+import os
+import struct
+import time
+from typing import BinaryIO, Dict, Iterator, NamedTuple, Optional, Sequence
+
+from .engine import ENGINE_VERSION
+
+MAGIC = b'TTTR'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sH')     # magic, format version
+GAME_HEADER = struct.Struct('<BBBHQ')   # size, win length, difficulty, engine version, seed
+
+# Moves are cell indices below this byte, which closes a game's move list
+END_OF_GAME = 0xFF
+MAX_RECORD_CELLS = END_OF_GAME
+
+DIFFICULTIES = ('', 'easy', 'medium', 'hard')
+RESULTS = (None, 'X', 'O', 'tie')     # None: abandoned before the end
+
+READ_CHUNK = 1 << 16
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.tictactoe', 'games.ttr')
+
+
+class GameRecord(NamedTuple):
+    """One recorded game"""
+    size: int
+    win_length: int
+    difficulty: str
+    engine_version: int
+    seed: int
+    moves: bytes
+    result: Optional[str]
+
+
+class RecordFormatError(ValueError):
+    """The file is not a game-record archive this version can read"""
+
+
+def difficulty_code(difficulty: str) -> int:
+    """Byte stored for a difficulty name; unknown names are stored as 0"""
+    difficulty = (difficulty or '').lower()
+    return DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 0
+
+
+class RecordWriter:
+    """Appends games to a record file, one byte per move as they are played
+
+    The file is opened on first use; if that fails the writer stays unavailable and
+    games are dropped, so play is never affected.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.handle: Optional[BinaryIO] = None
+        self.available: Optional[bool] = None
+        self.in_game = False
+        self.games = 0
+
+    def open(self) -> bool:
+        """Open for appending, writing the file header to a new file"""
+        if self.available is not None:
+            return self.available
+        self.available = False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handle = open(self.path, 'ab')
+            if handle.tell() == 0:
+                handle.write(FILE_HEADER.pack(MAGIC, VERSION))
+        except OSError:
+            return False
+        self.handle = handle
+        self.available = True
+        return True
+
+    def begin_game(self, size: int, win_length: int, difficulty: str = '', seed: int = 0):
+        """Start a game; an unfinished previous game is closed as abandoned
+
+        Games on boards the format cannot hold are dropped, like games played while the
+        file is unavailable.
+        """
+        if not self.open():
+            return
+        if self.in_game:
+            self.end_game(None)
+        if size * size > MAX_RECORD_CELLS:
+            return
+        self.handle.write(GAME_HEADER.pack(size, win_length, difficulty_code(difficulty),
+                                           ENGINE_VERSION, seed & 0xFFFFFFFFFFFFFFFF))
+        self.in_game = True
+
+    def add_move(self, index: int):
+        """Append one move of the current game"""
+        if self.in_game:
+            self.handle.write(bytes((index,)))
+
+    def end_game(self, result: Optional[str]):
+        """Close the current game with 'X', 'O', 'tie' or None, and flush it to disk"""
+        if not self.in_game:
+            return
+        self.handle.write(bytes((END_OF_GAME, RESULTS.index(result))))
+        self.handle.flush()
+        self.in_game = False
+        self.games += 1
+
+    def write_game(self, size: int, win_length: int, moves: Sequence[int],
+                   result: Optional[str], difficulty: str = '', seed: int = 0):
+        """Append a complete game in one write (left in the buffer until close)"""
+        if size * size > MAX_RECORD_CELLS:
+            raise ValueError(f"Records hold boards of at most {MAX_RECORD_CELLS} cells")
+        if not self.open():
+            return
+        if self.in_game:
+            self.end_game(None)
+        self.handle.write(GAME_HEADER.pack(size, win_length, difficulty_code(difficulty),
+                                           ENGINE_VERSION, seed & 0xFFFFFFFFFFFFFFFF)
+                          + bytes(moves) + bytes((END_OF_GAME, RESULTS.index(result))))
+        self.games += 1
+
+    def close(self):
+        """Finish an open game as abandoned and close the file"""
+        if not self.available:
+            return
+        self.end_game(None)
+        self.handle.close()
+        self.handle = None
+        self.available = None
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_games(path: str, chunk_size: int = READ_CHUNK) -> Iterator[GameRecord]:
+    """Yield every complete game in the file, reading it chunk by chunk
+
+    A game cut off at the end of the file (still being written) is skipped.
+    """
+    with open(path, 'rb') as handle:
+        header = handle.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size:
+            return
+        magic, version = FILE_HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise RecordFormatError(f"{path} is not a version {VERSION} game record file")
+
+        buffer = b''
+        offset = 0
+        while True:
+            # The header may contain 0xFF bytes, so the marker is searched for after it
+            end = buffer.find(END_OF_GAME, offset + GAME_HEADER.size)
+            while end < 0 or end + 1 >= len(buffer):
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    return
+                buffer = buffer[offset:] + chunk
+                offset = 0
+                end = buffer.find(END_OF_GAME, GAME_HEADER.size)
+
+            size, win_length, difficulty, engine_version, seed = GAME_HEADER.unpack_from(buffer, offset)
+            result = buffer[end + 1]
+            yield GameRecord(size, win_length,
+                             DIFFICULTIES[difficulty] if difficulty < len(DIFFICULTIES) else '',
+                             engine_version, seed, buffer[offset + GAME_HEADER.size:end],
+                             RESULTS[result] if result < len(RESULTS) else None)
+            offset = end + 2
+
+
+def summarize(path: str) -> Dict[str, int]:
+    """Count games and results in an archive"""
+    counts = {'games': 0, 'moves': 0, 'X': 0, 'O': 0, 'tie': 0, 'abandoned': 0}
+    for game in read_games(path):
+        counts['games'] += 1
+        counts['moves'] += len(game.moves)
+        counts[game.result or 'abandoned'] += 1
+    return counts
+
+
+def main():
+    """Command-line entry point to summarize a record archive"""
+    parser = argparse.ArgumentParser(description="Summarize a Tic Tac Toe game-record file")
+    parser.add_argument('path', help="Record file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = summarize(args.path)
+    elapsed = time.perf_counter() - started
+    print(f"{counts['games']} games, {counts['moves']} moves: X {counts['X']}  O {counts['O']}  "
+          f"tie {counts['tie']}  abandoned {counts['abandoned']}")
+    if elapsed > 0:
+        print(f"Read in {elapsed:.2f}s ({counts['games'] / elapsed:,.0f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Asyncio game server
+Hosts many concurrent games over a line-based JSON protocol on TCP. Sessions are either
+human vs computer or human vs human; computer moves are searched in a bounded process
+pool so a slow search never holds up the event loop or other sessions.
+
+Start with:
+    python -m tictactoe.server [--host 127.0.0.1] [--port 8765] [--workers 2]
+
+Requests and replies are one JSON object per line:
+    {"op": "new", "mode": "ai" | "pvp", "difficulty": "hard", "size": 3, "win_length": 3}
+    {"op": "join", "session": ID}             second player of a pvp session
+    {"op": "move", "session": ID, "index": 4}
+    {"op": "state", "session": ID}
+    {"op": "close", "session": ID}
+Replies carry "ok"; pvp opponents are also sent {"event": "move", ...} lines.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Optional
+
+from .board import Position
+from .cache import SharedPositionCache
+from .engine import DIFFICULTY_BUDGETS, EnginePool
+from .game import Game, integer_field
+from .tablebase import Tablebase
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Longest request line accepted
+MAX_LINE = 4096
+
+# Search jobs allowed to wait for a worker per worker process
+QUEUE_PER_WORKER = 64
+
+# Per-process engines, with the tablebase and shared cache mapping, used by search_move()
+_pool: Optional[EnginePool] = None
+
+
+def search_move(x_mask: int, o_mask: int, size: int, win_length: int,
+                difficulty: str) -> Optional[int]:
+    """Computer move for a position; runs in a worker process"""
+    global _pool
+    if _pool is None:
+        _pool = EnginePool(tablebase=Tablebase(), shared_cache=SharedPositionCache())
+    if difficulty not in DIFFICULTY_BUDGETS:
+        difficulty = 'hard'
+    return _pool.best_move(Position(x_mask, o_mask, size, win_length), difficulty)
+
+
+class ProtocolError(Exception):
+    """A request that cannot be served; the message is sent back to the client"""
+
+
+class Session:
+    """One hosted game and the connections playing it"""
+
+    def __init__(self, session_id: int, mode: str, difficulty: str, size: int,
+                 win_length: Optional[int]):
+        self.id = session_id
+        self.mode = mode
+        self.difficulty = difficulty
+        self.game = Game(size, win_length)
+        self.game.difficulty = difficulty
+        self.players: Dict[str, 'Connection'] = {}
+        self.lock = asyncio.Lock()
+
+    def state(self) -> Dict:
+        """Snapshot sent to clients"""
+        return {
+            'session': self.id,
+            'mode': self.mode,
+            'size': self.game.geometry.size,
+            'win_length': self.game.geometry.win_length,
+            'board': list(self.game.board),
+            'to_move': self.game.current_player,
+            'winner': self.game.winner,
+            'moves': self.game.moves
+        }
+
+
+class Connection:
+    """One client socket"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.sessions: Dict[int, str] = {}     # session id -> side played here
+
+    async def send(self, message: Dict):
+        """Write one JSON line"""
+        self.writer.write(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+        await self.writer.drain()
+
+
+class GameServer:
+    """Session registry, request dispatch and the computer-move pool"""
+
+    def __init__(self, workers: Optional[int] = None, executor: Optional[Executor] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor or ProcessPoolExecutor(max_workers=self.workers)
+        self.search_slots = asyncio.Semaphore(self.workers * QUEUE_PER_WORKER)
+        self.sessions: Dict[int, Session] = {}
+        self.ids = itertools.count(1)
+        self.stats = {'connections': 0, 'sessions': 0, 'moves': 0, 'ai_moves': 0}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one connection until it closes"""
+        connection = Connection(reader, writer)
+        self.stats['connections'] += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ProtocolError("Request must be a JSON object")
+                    reply = await self.dispatch(connection, request)
+                except (ProtocolError, ValueError) as error:
+                    reply = {'ok': False, 'error': str(error)}
+                await connection.send(reply)
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in list(connection.sessions):
+                self.leave(connection, session_id)
+            writer.close()
+
+    async def dispatch(self, connection: Connection, request: Dict) -> Dict:
+        """Run one request and build its reply"""
+        op = request.get('op')
+        if op == 'new':
+            return self.new_session(connection, request)
+        if op == 'stats':
+            return {'ok': True, 'sessions_open': len(self.sessions), **self.stats}
+
+        session_id = request.get('session')
+        session = None
+        if isinstance(session_id, int) and not isinstance(session_id, bool):
+            session = self.sessions.get(session_id)
+        if session is None:
+            raise ProtocolError("Unknown session")
+        if op == 'join':
+            return self.join(connection, session)
+        if op == 'move':
+            return await self.move(connection, session, request.get('index'))
+        if op == 'state':
+            return {'ok': True, **session.state()}
+        if op == 'close':
+            self.leave(connection, session.id)
+            return {'ok': True, 'session': session.id}
+        raise ProtocolError(f"Unknown op: {op}")
+
+    def new_session(self, connection: Connection, request: Dict) -> Dict:
+        """Create a session; the creator plays X"""
+        mode = request.get('mode', 'ai')
+        if mode not in ('ai', 'pvp'):
+            raise ProtocolError("mode must be 'ai' or 'pvp'")
+        difficulty = str(request.get('difficulty', 'hard')).lower()
+        if difficulty not in DIFFICULTY_BUDGETS:
+            raise ProtocolError(f"difficulty must be one of {', '.join(DIFFICULTY_BUDGETS)}")
+        try:
+            size = integer_field(request, 'size', 3)
+            win_length = integer_field(request, 'win_length')
+        except ValueError as error:
+            raise ProtocolError(str(error)) from None
+        session = Session(next(self.ids), mode, difficulty, size, win_length)
+        session.players['X'] = connection
+        connection.sessions[session.id] = 'X'
+        self.sessions[session.id] = session
+        self.stats['sessions'] += 1
+        return {'ok': True, 'player': 'X', **session.state()}
+
+    def join(self, connection: Connection, session: Session) -> Dict:
+        """Take the O seat of a pvp session"""
+        if session.mode != 'pvp' or 'O' in session.players:
+            raise ProtocolError("Session has no free seat")
+        session.players['O'] = connection
+        connection.sessions[session.id] = 'O'
+        return {'ok': True, 'player': 'O', **session.state()}
+
+    def leave(self, connection: Connection, session_id: int):
+        """Drop a connection from a session, discarding the session once empty"""
+        session = self.sessions.get(session_id)
+        side = connection.sessions.pop(session_id, None)
+        if session is None or side is None:
+            return
+        session.players.pop(side, None)
+        if not session.players:
+            del self.sessions[session_id]
+
+    async def move(self, connection: Connection, session: Session, index) -> Dict:
+        """Play the caller's move, then the computer's reply in ai sessions"""
+        side = connection.sessions.get(session.id)
+        if side is None:
+            raise ProtocolError("Not a player of this session")
+        if not isinstance(index, int) or isinstance(index, bool):
+            raise ProtocolError("index must be an integer")
+
+        async with session.lock:
+            game = session.game
+            if game.current_player != side:
+                raise ProtocolError("Not your turn")
+            game.make_move(index)
+            self.stats['moves'] += 1
+
+            reply_move = None
+            if session.mode == 'ai' and not game.game_over:
+                board = game.board
+                async with self.search_slots:
+                    reply_move = await asyncio.get_running_loop().run_in_executor(
+                        self.executor, search_move, board.x_mask, board.o_mask,
+                        board.size, board.win_length, session.difficulty)
+                if reply_move is not None and session.id in self.sessions:
+                    game.make_move(reply_move)
+                    self.stats['ai_moves'] += 1
+
+            state = session.state()
+
+        if session.mode == 'pvp':
+            opponent = session.players.get('O' if side == 'X' else 'X')
+            if opponent is not None:
+                try:
+                    await opponent.send({'event': 'move', 'index': index, **state})
+                except ConnectionError:
+                    pass
+        return {'ok': True, 'ai_move': reply_move, **state}
+
+    def close(self):
+        """Stop the worker pool"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                workers: Optional[int] = None):
+    """Run the server until cancelled"""
+    game_server = GameServer(workers)
+    server = await asyncio.start_server(game_server.handle_client, host, port, limit=MAX_LINE)
+    print(f"Serving on {host}:{port} with {game_server.workers} search worker(s)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+def main():
+    """Command-line entry point for the game server"""
+    parser = argparse.ArgumentParser(description="Host Tic Tac Toe games over TCP")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Search processes (default: CPU count)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
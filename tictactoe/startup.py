@@ -0,0 +1,57 @@
+"""
+Startup timing
+Named milestones from launch to a fully built window, reported against a target time
+for the first frame, so cold starts can be measured and kept fast.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from . import instrument
+
+# Launch to first frame (board visible and clickable), in milliseconds
+FIRST_FRAME_TARGET_MS = 250.0
+
+
+class StartupTimer:
+    """Milliseconds from a start time to each marked milestone"""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = time.perf_counter() if started is None else started
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str):
+        """Record a milestone; traced as a span from the previous one"""
+        now = time.perf_counter()
+        previous = self.started + self.marks[-1][1] / 1000 if self.marks else self.started
+        self.marks.append((name, (now - self.started) * 1000))
+        instrument.add_span(f"startup:{name}", 'startup', int(previous * 1e9), int(now * 1e9))
+
+    def elapsed(self, name: str) -> Optional[float]:
+        for mark, elapsed in self.marks:
+            if mark == name:
+                return elapsed
+        return None
+
+    def report(self, milestone: str = 'first_frame',
+               target_ms: float = FIRST_FRAME_TARGET_MS) -> Dict:
+        """Milestones, the target and whether milestone was reached within it"""
+        reached = self.elapsed(milestone)
+        return {
+            'marks_ms': {name: round(elapsed, 1) for name, elapsed in self.marks},
+            'milestone': milestone,
+            'target_ms': target_ms,
+            'met': reached is not None and reached <= target_ms
+        }
+
+    def format_report(self, milestone: str = 'first_frame',
+                      target_ms: float = FIRST_FRAME_TARGET_MS) -> str:
+        report = self.report(milestone, target_ms)
+        lines = ["Startup timing:"]
+        previous = 0.0
+        for name, elapsed in self.marks:
+            lines.append(f"  {name:<14}{elapsed:>9.1f} ms  (+{elapsed - previous:.1f})")
+            previous = elapsed
+        verdict = "met" if report['met'] else "MISSED"
+        lines.append(f"  target: {milestone} within {target_ms:.0f} ms - {verdict}")
+        return '\n'.join(lines)
@@ -0,0 +1,108 @@
+"""
+Board symmetries
+A square board has 8 symmetries (4 rotations, each optionally mirrored). Positions are
+mapped to a canonical representative so caches and tablebases store one entry per class.
+"""
+
+from functools import lru_cache
+from typing import List, Tuple
+
+TRANSFORM_NAMES = (
+    'identity', 'rotate_90', 'rotate_180', 'rotate_270',
+    'flip_horizontal', 'flip_vertical', 'transpose', 'anti_transpose'
+)
+
+# Index of the transform that undoes each transform
+INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+
+# Masks are transformed in 9-bit chunks through lookup tables
+CHUNK_BITS = 9
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+def _image(size: int, transform: int, row: int, col: int) -> Tuple[int, int]:
+    last = size - 1
+    return (
+        (row, col),
+        (col, last - row),
+        (last - row, last - col),
+        (last - col, row),
+        (row, last - col),
+        (last - row, col),
+        (col, row),
+        (last - col, last - row)
+    )[transform]
+
+
+class Symmetry:
+    """Cell permutations and fast mask transforms for a size x size board"""
+
+    def __init__(self, size: int = 3):
+        self.size = size
+        self.cells = size * size
+        self.permutations: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(
+                r * size + c
+                for r, c in (_image(size, t, i // size, i % size) for i in range(self.cells))
+            )
+            for t in range(8)
+        )
+        self.chunks = (self.cells + CHUNK_BITS - 1) // CHUNK_BITS
+        self.tables: List[List[Tuple[int, ...]]] = [
+            [self._chunk_table(t, chunk) for chunk in range(self.chunks)]
+            for t in range(8)
+        ]
+
+    def _chunk_table(self, transform: int, chunk: int) -> Tuple[int, ...]:
+        permutation = self.permutations[transform]
+        base = chunk * CHUNK_BITS
+        width = min(CHUNK_BITS, self.cells - base)
+        images = [1 << permutation[base + bit] for bit in range(width)]
+        table = [0] * (1 << width)
+        for bits in range(1, 1 << width):
+            low = bits & -bits
+            table[bits] = table[bits ^ low] | images[low.bit_length() - 1]
+        return tuple(table)
+
+    def transform(self, mask: int, transform: int) -> int:
+        """Apply one of the 8 transforms to a cell mask"""
+        if transform == 0:
+            return mask
+        result = 0
+        for table in self.tables[transform]:
+            if mask:
+                result |= table[mask & CHUNK_MASK]
+            mask >>= CHUNK_BITS
+        return result
+
+    def canonical(self, first: int, second: int) -> Tuple[int, int, int]:
+        """Smallest (first, second) image over all transforms, plus the transform used"""
+        best = (first, second, 0)
+        for t in range(1, 8):
+            image = (self.transform(first, t), self.transform(second, t))
+            if image < best[:2]:
+                best = (image[0], image[1], t)
+        return best
+
+    def move_to_canonical(self, move: int, transform: int) -> int:
+        """Map a cell index into the canonical frame"""
+        return self.permutations[transform][move]
+
+    def move_from_canonical(self, move: int, transform: int) -> int:
+        """Map a canonical cell index back onto the original board"""
+        return self.permutations[INVERSE[transform]][move]
+
+    def mask_from_canonical(self, mask: int, transform: int) -> int:
+        """Map a canonical cell mask back onto the original board"""
+        return self.transform(mask, INVERSE[transform])
+
+
+@lru_cache(maxsize=None)
+def symmetry_for(size: int = 3) -> Symmetry:
+    """Shared Symmetry instance per board size"""
+    return Symmetry(size)
+
+
+def canonicalize(x_mask: int, o_mask: int, size: int = 3) -> Tuple[int, int, int]:
+    """Canonical (x_mask, o_mask, transform) of a position"""
+    return symmetry_for(size).canonical(x_mask, o_mask)
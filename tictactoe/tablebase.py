@@ -0,0 +1,215 @@
+"""
+Perfect-play tablebase for the 3x3 board
+Every reachable position is solved once and written to a compact binary file.
+Only one position per symmetry class is stored; probes canonicalize the board,
+binary-search the memory-mapped key array and map the moves back.
+
+Generate the file with:
+    python -m tictactoe.tablebase [--output PATH]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .board import Board, geometry_for, iter_bits
+from .symmetry import symmetry_for
+
+MAGIC = b'TTTB'
+VERSION = 3
+HEADER = struct.Struct('<4sHHI')     # magic, version, reserved, entry count
+KEY = struct.Struct('<I')            # canonical position index, sorted ascending
+ENTRY = struct.Struct('<bBH')        # value, distance, best-move mask (canonical frame)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebase.bin')
+
+CLASSIC = geometry_for(3)
+
+# Base-3 contribution of every 9-bit mask, so indexing is two lookups and an add
+_TERNARY = tuple(sum(3 ** i for i in iter_bits(mask)) for mask in range(CLASSIC.full_mask + 1))
+
+
+class TablebaseEntry(NamedTuple):
+    """Solved position, scored for the side to move"""
+    value: int        # 1 win, 0 draw, -1 loss
+    distance: int     # plies to the end of the game under perfect play
+    moves: int        # bitmask of every optimal move
+
+
+def position_index(x_mask: int, o_mask: int) -> int:
+    """Direct table index of a position (X = 1, O = 2 in base 3)"""
+    return _TERNARY[x_mask] + 2 * _TERNARY[o_mask]
+
+
+def solve_positions() -> Dict[Tuple[int, int], TablebaseEntry]:
+    """Enumerate and solve every position reachable from the empty board"""
+    solved: Dict[Tuple[int, int], TablebaseEntry] = {}
+
+    def solve(mover: int, waiting: int, x_to_move: bool) -> Tuple[int, int]:
+        key = (mover, waiting) if x_to_move else (waiting, mover)
+        entry = solved.get(key)
+        if entry is not None:
+            return entry.value, entry.distance
+
+        empty = CLASSIC.full_mask & ~(mover | waiting)
+        if CLASSIC.has_line(waiting):
+            entry = TablebaseEntry(-1, 0, 0)
+        elif not empty:
+            entry = TablebaseEntry(0, 0, 0)
+        else:
+            results = []
+            for i in iter_bits(empty):
+                value, distance = solve(waiting, mover | (1 << i), not x_to_move)
+                results.append((i, -value, distance + 1))
+            best_value = max(value for _, value, _ in results)
+            candidates = [(i, distance) for i, value, distance in results if value == best_value]
+            if best_value > 0:
+                best_distance = min(distance for _, distance in candidates)
+            else:
+                best_distance = max(distance for _, distance in candidates)
+            # Optimal means the best value reached as fast (wins) or as late (others) as possible
+            moves = 0
+            for i, value, distance in results:
+                if value == best_value and distance == best_distance:
+                    moves |= 1 << i
+            entry = TablebaseEntry(best_value, best_distance, moves)
+
+        solved[key] = entry
+        return entry.value, entry.distance
+
+    solve(0, 0, True)
+    return solved
+
+
+def canonical_positions() -> Dict[int, TablebaseEntry]:
+    """Solved positions keyed by the index of their canonical form"""
+    symmetry = symmetry_for(3)
+    canonical: Dict[int, TablebaseEntry] = {}
+    for (x_mask, o_mask), entry in solve_positions().items():
+        cx, co, transform = symmetry.canonical(x_mask, o_mask)
+        if transform == 0:
+            canonical[position_index(cx, co)] = entry
+    return canonical
+
+
+def build_tablebase(path: str = DEFAULT_PATH) -> int:
+    """Solve every position and write the binary tablebase, returning the entry count"""
+    canonical = canonical_positions()
+    keys = sorted(canonical)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, 0, len(keys)))
+        for key in keys:
+            handle.write(KEY.pack(key))
+        for key in keys:
+            handle.write(ENTRY.pack(*canonical[key]))
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+class Tablebase:
+    """Lazily memory-mapped view of a tablebase file"""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.data: Optional[mmap.mmap] = None
+        self.available: Optional[bool] = None
+        self.entries = 0
+        self.open_lock = threading.Lock()
+
+    def open(self) -> bool:
+        """Map the file on first use; False if it is missing or invalid
+
+        Safe to call from several threads; available is only set once the outcome is known.
+        """
+        if self.available is not None:
+            return self.available
+        with self.open_lock:
+            if self.available is None:
+                self.available = self.map_file()
+        return self.available
+
+    def map_file(self) -> bool:
+        try:
+            with open(self.path, 'rb') as handle:
+                data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        if len(data) < HEADER.size:
+            data.close()
+            return False
+        magic, version, _, entries = HEADER.unpack_from(data, 0)
+        if (magic != MAGIC or version != VERSION
+                or len(data) != HEADER.size + entries * (KEY.size + ENTRY.size)):
+            data.close()
+            return False
+        self.data = data
+        self.entries = entries
+        return True
+
+    def close(self):
+        """Release the mapping"""
+        if self.data is not None:
+            self.data.close()
+        self.data = None
+        self.available = None
+
+    def find(self, key: int) -> int:
+        """Binary search for a canonical key; -1 when absent"""
+        low, high = 0, self.entries - 1
+        while low <= high:
+            middle = (low + high) // 2
+            found = KEY.unpack_from(self.data, HEADER.size + middle * KEY.size)[0]
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle - 1
+            else:
+                return middle
+        return -1
+
+    def probe(self, board: Sequence[str]) -> Optional[TablebaseEntry]:
+        """Look up a position; None if it is unreachable or no file is present"""
+        if not self.open():
+            return None
+        if not isinstance(board, Board):
+            board = Board(board)
+        elif not board.geometry.is_classic:
+            return None
+        symmetry = symmetry_for(3)
+        cx, co, transform = symmetry.canonical(board.x_mask, board.o_mask)
+        slot = self.find(position_index(cx, co))
+        if slot < 0:
+            return None
+        offset = HEADER.size + self.entries * KEY.size + slot * ENTRY.size
+        value, distance, moves = ENTRY.unpack_from(self.data, offset)
+        return TablebaseEntry(value, distance, symmetry.mask_from_canonical(moves, transform))
+
+    def best_moves(self, board: Sequence[str]) -> List[int]:
+        """Every optimal move for the side to move"""
+        entry = self.probe(board)
+        return list(iter_bits(entry.moves)) if entry is not None else []
+
+    def best_move(self, board: Sequence[str]) -> Optional[int]:
+        """Lowest-index optimal move, matching the minimax tie-break"""
+        entry = self.probe(board)
+        if entry is None or not entry.moves:
+            return None
+        return next(iter_bits(entry.moves))
+
+
+def main():
+    """Command-line entry point to (re)generate the tablebase"""
+    parser = argparse.ArgumentParser(description="Generate the Tic Tac Toe tablebase")
+    parser.add_argument('--output', default=DEFAULT_PATH, help="Destination file")
+    args = parser.parse_args()
+    count = build_tablebase(args.output)
+    print(f"Wrote {count} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
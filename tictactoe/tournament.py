@@ -0,0 +1,269 @@
+"""
+Self-play tournament runner
+Plays engine configurations against each other across a process pool, with one seeded
+RNG per game so any single game can be replayed, and reports win/draw/loss tables.
+The easy/medium/hard players search to their depth budget with no time limit, so results
+do not depend on machine load or the worker count.
+
+Run with:
+    python -m tictactoe.tournament [--players random,mix70,hard] [--games 200] [--workers 4]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .board import Board, geometry_for
+from .cache import SharedPositionCache
+from .engine import DIFFICULTY_BUDGETS, SearchEngine, default_depth
+from .game import play_game
+from .mcts import DIFFICULTY_PLAYOUTS, MCTSEngine
+from .record import MAX_RECORD_CELLS, RecordWriter
+
+# Chance the original "medium" level played the best move instead of a random one
+MIX_BEST_CHANCE = 0.7
+
+PLAYERS = ('random', 'minimax', 'alphabeta', 'mcts', 'mix70', 'easy', 'medium', 'hard')
+
+# Search engines are deterministic, so each worker process keeps one per (player, side, board)
+_engines: Dict[Tuple[str, str, int, int], SearchEngine] = {}
+
+# Position cache shared by the workers; set in each worker by use_shared_cache()
+_position_cache: Optional[SharedPositionCache] = None
+
+
+class GameTask(NamedTuple):
+    """One game to play; everything a worker needs to reproduce it"""
+    x_player: str
+    o_player: str
+    seed: int
+    size: int
+    win_length: int
+
+
+class GameOutcome(NamedTuple):
+    """Result of one game"""
+    x_player: str
+    o_player: str
+    winner: str     # 'X', 'O' or 'tie'
+    moves: Tuple[int, ...]
+    search_seconds: float = 0.0     # time both agents spent choosing moves
+
+
+def game_seed(base_seed: int, index: int) -> int:
+    """Independent, reproducible seed for the index-th game of a run"""
+    return random.Random(base_seed * 1000003 + index).getrandbits(32)
+
+
+def use_shared_cache(path: Optional[str]):
+    """Let this process's engines share the position cache file at path"""
+    global _position_cache
+    _position_cache = SharedPositionCache(path) if path else None
+    _engines.clear()
+
+
+def cached_engine(name: str, side: str, task: GameTask, mode: str) -> SearchEngine:
+    """Per-process search engine for a player, side and board"""
+    key = (name, side, task.size, task.win_length)
+    engine = _engines.get(key)
+    if engine is None:
+        engine = SearchEngine(ai_player=side, human_player='O' if side == 'X' else 'X', mode=mode,
+                              shared_cache=_position_cache)
+        _engines[key] = engine
+    return engine
+
+
+def make_agent(name: str, side: str, task: GameTask,
+               rng: random.Random) -> Callable[[Board], Optional[int]]:
+    """Board -> move function for one player configuration"""
+    def random_move(board: Board) -> Optional[int]:
+        cells = board.empty_cells()
+        return rng.choice(cells) if cells else None
+
+    if name == 'random':
+        return random_move
+    if name == 'mcts':
+        mcts = MCTSEngine(playouts=DIFFICULTY_PLAYOUTS['hard'], seed=rng.getrandbits(32))
+        return mcts.best_move
+    if name in DIFFICULTY_BUDGETS:
+        # Depth budget only: a wall-clock limit would make moves depend on machine load
+        engine = cached_engine(name, side, task, 'alphabeta')
+        max_depth = DIFFICULTY_BUDGETS[name].max_depth
+        if max_depth is None:
+            max_depth = default_depth(geometry_for(task.size, task.win_length))
+        return lambda board: engine.think(board, max_depth=max_depth).move
+
+    engine = cached_engine(name, side, task, 'alphabeta' if name == 'alphabeta' else 'minimax')
+    if name == 'mix70':
+        return lambda board: (engine.best_move(board) if rng.random() < MIX_BEST_CHANCE
+                              else random_move(board))
+    return engine.best_move
+
+
+def play_task(task: GameTask) -> GameOutcome:
+    """Play one game in a worker process"""
+    rng = random.Random(task.seed)
+    spent = [0.0]
+
+    def timed(agent: Callable[[Board], Optional[int]]) -> Callable[[Board], Optional[int]]:
+        def move(board: Board) -> Optional[int]:
+            started = time.perf_counter()
+            try:
+                return agent(board)
+            finally:
+                spent[0] += time.perf_counter() - started
+        return move
+
+    x_agent = timed(make_agent(task.x_player, 'X', task, rng))
+    o_agent = timed(make_agent(task.o_player, 'O', task, rng))
+    game = play_game(x_agent, o_agent, task.size, task.win_length)
+    return GameOutcome(task.x_player, task.o_player, game.winner or 'tie', tuple(game.moves),
+                       spent[0])
+
+
+def schedule(players: Sequence[str], games: int, seed: int, size: int,
+             win_length: int) -> Iterator[GameTask]:
+    """Round robin: every pair plays games games, alternating who moves first"""
+    index = 0
+    for first, second in itertools.combinations(players, 2):
+        for number in range(games):
+            x_player, o_player = (first, second) if number % 2 == 0 else (second, first)
+            yield GameTask(x_player, o_player, game_seed(seed, index), size, win_length)
+            index += 1
+
+
+def run_tournament(players: Sequence[str], games: int = 100, seed: int = 0,
+                   size: int = 3, win_length: Optional[int] = None,
+                   workers: Optional[int] = None, record_path: Optional[str] = None,
+                   cache_path: Optional[str] = None) -> Dict:
+    """Play the round robin on a process pool and aggregate the results
+
+    With record_path, every game is appended to that game-record file. With cache_path,
+    the workers share a position cache, which only serves results searched to the same
+    depth, so the games come out the same either way.
+    """
+    win_length = size if win_length is None else win_length
+    if record_path and size * size > MAX_RECORD_CELLS:
+        raise ValueError(f"Game records hold boards of at most {MAX_RECORD_CELLS} cells")
+    tasks = list(schedule(players, games, seed, size, win_length))
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers == 1:
+        use_shared_cache(cache_path)
+        outcomes = [play_task(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=use_shared_cache,
+                                 initargs=(cache_path,)) as pool:
+            outcomes = list(pool.map(play_task, tasks, chunksize=chunksize))
+    elapsed = time.perf_counter() - started
+
+    if record_path:
+        with RecordWriter(record_path) as writer:
+            for task, outcome in zip(tasks, outcomes):
+                writer.write_game(size, win_length, outcome.moves, outcome.winner, seed=task.seed)
+
+    # table[a][b] = [wins, draws, losses] of a against b, over both colours
+    table = {a: {b: [0, 0, 0] for b in players if b != a} for a in players}
+    plies = 0
+    search_seconds = 0.0
+    for outcome in outcomes:
+        plies += len(outcome.moves)
+        search_seconds += outcome.search_seconds
+        x_row = table[outcome.x_player][outcome.o_player]
+        o_row = table[outcome.o_player][outcome.x_player]
+        if outcome.winner == 'X':
+            x_row[0] += 1
+            o_row[2] += 1
+        elif outcome.winner == 'O':
+            x_row[2] += 1
+            o_row[0] += 1
+        else:
+            x_row[1] += 1
+            o_row[1] += 1
+
+    return {
+        'players': list(players),
+        'games_per_pair': games,
+        'seed': seed,
+        'board': f"{size}x{size}/{win_length}",
+        'workers': workers,
+        'games': len(outcomes),
+        'seconds': round(elapsed, 3),
+        'games_per_second': round(len(outcomes) / elapsed, 1) if elapsed > 0 else None,
+        'average_plies': round(plies / len(outcomes), 2) if outcomes else None,
+        'search_ms_per_move': round(search_seconds / plies * 1000, 3) if plies else None,
+        'table': table
+    }
+
+
+def standings(report: Dict) -> List[Tuple[str, int, int, int]]:
+    """(player, wins, draws, losses) totals, best score first"""
+    rows = []
+    for player, opponents in report['table'].items():
+        wins, draws, losses = (sum(row[i] for row in opponents.values()) for i in range(3))
+        rows.append((player, wins, draws, losses))
+    return sorted(rows, key=lambda row: (-(row[1] + 0.5 * row[2]), row[0]))
+
+
+def print_report(report: Dict):
+    """Cross table and standings"""
+    players = report['players']
+    width = max(9, max(len(player) for player in players) + 1)
+    print(f"{'W/D/L':<{width}}" + ''.join(f"{player:>{width + 4}}" for player in players))
+    for player in players:
+        cells = []
+        for opponent in players:
+            row = report['table'][player].get(opponent)
+            cells.append(f"{'-' if row is None else '/'.join(map(str, row)):>{width + 4}}")
+        print(f"{player:<{width}}" + ''.join(cells))
+    print()
+    for player, wins, draws, losses in standings(report):
+        total = wins + draws + losses
+        print(f"{player:<{width}} W {wins:>6}  D {draws:>6}  L {losses:>6}  "
+              f"score {(wins + 0.5 * draws) / total:.3f}")
+    print(f"\n{report['games']} games in {report['seconds']:.2f}s on {report['workers']} "
+          f"worker(s): {report['games_per_second']} games/s, "
+          f"{report['average_plies']} plies per game, "
+          f"{report['search_ms_per_move']} ms of search per move")
+
+
+def main():
+    """Command-line entry point for self-play tournaments"""
+    parser = argparse.ArgumentParser(description="Play engine configurations against each other")
+    parser.add_argument('--players', default='random,mix70,alphabeta,mcts',
+                        help=f"Comma-separated players from {', '.join(PLAYERS)}")
+    parser.add_argument('--games', type=int, default=100, help="Games per pair of players")
+    parser.add_argument('--seed', type=int, default=0, help="Base seed for the per-game RNGs")
+    parser.add_argument('--size', type=int, default=3, help="Board size")
+    parser.add_argument('--win-length', type=int, default=None, help="Pieces in a row to win")
+    parser.add_argument('--workers', type=int, default=None, help="Processes (default: CPU count)")
+    parser.add_argument('--output', default=None, help="Write the report as JSON")
+    parser.add_argument('--record', default=None, help="Append every game to this record file")
+    parser.add_argument('--shared-cache', default=None,
+                        help="Share searched positions between workers through this cache file")
+    args = parser.parse_args()
+
+    players = [player.strip() for player in args.players.split(',') if player.strip()]
+    unknown = [player for player in players if player not in PLAYERS]
+    if unknown or len(players) < 2:
+        parser.error(f"Need two or more players from {', '.join(PLAYERS)}")
+
+    if args.record and args.size * args.size > MAX_RECORD_CELLS:
+        parser.error(f"--record holds boards of at most {MAX_RECORD_CELLS} cells")
+
+    report = run_tournament(players, args.games, args.seed, args.size,
+                            args.win_length, args.workers, args.record, args.shared_cache)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Trace summaries
+Per-span totals of a Chrome trace written by tictactoe.instrument, and conversion of
+such a trace to speedscope.
+
+Run with:
+    python -m tictactoe.traces moves.json [--speedscope moves.speedscope.json]
+"""
+
+import argparse
+import json
+from typing import Any, Dict, List
+
+from .instrument import SpanEvent, Tracer
+
+
+def summarize(document: Dict) -> List[Dict[str, Any]]:
+    """Per-span totals of a Chrome trace, largest total first"""
+    totals: Dict[str, List[float]] = {}
+    for event in document.get('traceEvents', []):
+        if event.get('ph') == 'X':
+            totals.setdefault(event['name'], []).append(event['dur'] / 1000)
+    rows = [{'name': name, 'count': len(times), 'total_ms': round(sum(times), 3),
+             'mean_ms': round(sum(times) / len(times), 3), 'max_ms': round(max(times), 3)}
+            for name, times in totals.items()]
+    return sorted(rows, key=lambda row: -row['total_ms'])
+
+
+def load_chrome_trace(path: str) -> Tracer:
+    """Tracer rebuilt from a Chrome trace written by this module"""
+    with open(path) as handle:
+        document = json.load(handle)
+    tracer = Tracer()
+    tracer.origin = 0
+    for event in document.get('traceEvents', []):
+        if event.get('ph') == 'X':
+            start = int(event['ts'] * 1000)
+            tracer.spans.append(SpanEvent(event['name'], event.get('cat', ''), start,
+                                          start + int(event['dur'] * 1000), event['tid'],
+                                          event.get('args')))
+        elif event.get('ph') == 'M' and event.get('name') == 'thread_name':
+            tracer.thread_names[event['tid']] = event['args']['name']
+    return tracer
+
+
+def main():
+    """Command-line entry point for trace summaries"""
+    parser = argparse.ArgumentParser(description="Summarize a Tic Tac Toe Chrome trace")
+    parser.add_argument('trace', help="Chrome trace written with TICTACTOE_TRACE")
+    parser.add_argument('--speedscope', default=None, help="Also convert it to this speedscope file")
+    args = parser.parse_args()
+
+    with open(args.trace) as handle:
+        rows = summarize(json.load(handle))
+    print(f"{'span':<24}{'count':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}")
+    for row in rows:
+        print(f"{row['name']:<24}{row['count']:>8}{row['total_ms']:>12.3f}"
+              f"{row['mean_ms']:>10.3f}{row['max_ms']:>10.3f}")
+    if args.speedscope:
+        load_chrome_trace(args.trace).write(args.speedscope)
+
+
+if __name__ == "__main__":
+    main()
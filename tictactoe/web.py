@@ -0,0 +1,152 @@
+"""
+HTTP server for the browser version
+Serves index.html and a move endpoint backed by the Python engine (tablebase and
+transposition tables included), so the page no longer has to run minimax itself.
+The page falls back to its own JavaScript search when this server is not behind it.
+
+Start with:
+    python -m tictactoe.web [--host 127.0.0.1] [--port 8000]
+
+POST /api/move  {"board": ["X", "", ...], "difficulty": "hard", "size": 3, "win_length": 3}
+            ->  {"move": 4, "player": "O", "score": 0, "nodes": 0}
+"""
+
+import argparse
+import json
+import os
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from .board import Board
+from .cache import SharedPositionCache
+from .engine import DIFFICULTY_BUDGETS, EnginePool
+from .game import integer_field
+from .tablebase import Tablebase
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'index.html')
+
+# Largest request body accepted, in bytes
+MAX_BODY = 16384
+
+
+class MoveService:
+    """Move search for all request threads; concurrent requests search in parallel"""
+
+    def __init__(self):
+        self.tablebase = Tablebase()
+        self.position_cache = SharedPositionCache()
+        self.pool = EnginePool(tablebase=self.tablebase, shared_cache=self.position_cache)
+
+    def best_move(self, request: Dict) -> Dict:
+        """Search the requested position; raises ValueError on a malformed request"""
+        cells = request.get('board')
+        size = integer_field(request, 'size', 3)
+        win_length = integer_field(request, 'win_length', size)
+        if not isinstance(cells, list) or len(cells) != size * size:
+            raise ValueError(f"board must be a list of {size * size} cells")
+        if any(cell not in ('X', 'O', '') for cell in cells):
+            raise ValueError("cells must be 'X', 'O' or ''")
+        # X opens, so X has as many pieces as O or one more
+        if cells.count('X') - cells.count('O') not in (0, 1):
+            raise ValueError("board is not reachable: X must have as many pieces as O or one more")
+        difficulty = str(request.get('difficulty', 'hard')).lower()
+        budget = DIFFICULTY_BUDGETS.get(difficulty)
+        if budget is None:
+            raise ValueError(f"difficulty must be one of {', '.join(DIFFICULTY_BUDGETS)}")
+
+        position = Board(cells, size, win_length).position()
+        if position.winner() is not None:
+            return {'move': None, 'player': None, 'score': None, 'nodes': 0}
+        player = position.to_move
+        result = self.pool.search(position, difficulty)
+        return {'move': result.move, 'player': player, 'score': result.score, 'nodes': result.nodes}
+
+
+class GameRequestHandler(BaseHTTPRequestHandler):
+    """Serves the page, a health check and the move endpoint"""
+
+    server_version = 'TicTacToe/1.2.9'
+    service: MoveService = None     # set by make_server()
+    quiet = True
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path in ('/', '/index.html'):
+            try:
+                with open(INDEX_PATH, 'rb') as handle:
+                    body = handle.read()
+            except OSError:
+                self.send_error(HTTPStatus.NOT_FOUND, "index.html is missing")
+                return
+            self.send_body(HTTPStatus.OK, body, 'text/html; charset=utf-8')
+        elif path == '/api/health':
+            self.send_json(HTTPStatus.OK, {'ok': True})
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def do_POST(self):
+        if self.path.split('?', 1)[0] != '/api/move':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if not 0 < length <= MAX_BODY:
+                raise ValueError("missing or oversized body")
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise ValueError("body must be a JSON object")
+            reply = self.service.best_move(request)
+        except (TypeError, ValueError) as error:
+            self.send_json(HTTPStatus.BAD_REQUEST, {'error': str(error)})
+            return
+        self.send_json(HTTPStatus.OK, reply)
+
+    def send_json(self, status: HTTPStatus, payload: Dict):
+        """Reply with a JSON body"""
+        self.send_body(status, json.dumps(payload).encode(), 'application/json')
+
+    def send_body(self, status: HTTPStatus, body: bytes, content_type: str):
+        """Reply with a complete body"""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                quiet: bool = True) -> ThreadingHTTPServer:
+    """HTTP server with its own move service"""
+    handler = type('Handler', (GameRequestHandler,), {'service': MoveService(), 'quiet': quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    """Command-line entry point for the HTTP server"""
+    parser = argparse.ArgumentParser(description="Serve the browser Tic Tac Toe with the Python engine")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, quiet=not args.verbose)
+    print(f"Serving index.html on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Background search for the Tk front ends
+Searches run in an executor; the Tk thread polls for the result with after() so
+widgets are only ever touched from the main loop. Cancelled searches are dropped; any
+other error in a search is reported through Tk's report_callback_exception.
+"""
+
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .engine import SearchCancelled
+
+
+class SearchWorker:
+    """Runs one search at a time off the Tk main loop"""
+
+    def __init__(self, window, poll_interval: int = 15, executor: Optional[Executor] = None):
+        self.window = window
+        self.poll_interval = poll_interval
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='search')
+        self.generation = 0
+        self.stop_event = threading.Event()
+        self.pending: Optional[Future] = None
+
+    def submit(self, search: Callable[[threading.Event], Any], callback: Callable[[Any], None]):
+        """Start search(stop_event) in the background and call callback(result) on the Tk thread"""
+        self.cancel()
+        self.stop_event = threading.Event()
+        generation = self.generation
+        future = self.executor.submit(search, self.stop_event)
+        self.pending = future
+        self.window.after(self.poll_interval, lambda: self._poll(future, generation, callback))
+
+    def _poll(self, future: Future, generation: int, callback: Callable[[Any], None]):
+        if generation != self.generation:
+            return
+        if not future.done():
+            self.window.after(self.poll_interval, lambda: self._poll(future, generation, callback))
+            return
+        self.pending = None
+        if future.cancelled():
+            return
+        error = future.exception()
+        if isinstance(error, SearchCancelled):
+            return
+        if error is not None:
+            self.window.report_callback_exception(type(error), error, error.__traceback__)
+            return
+        callback(future.result())
+
+    def busy(self) -> bool:
+        """True while a search is in flight"""
+        return self.pending is not None
+
+    def cancel(self):
+        """Abandon the running search; its result will never be delivered"""
+        self.generation += 1
+        self.stop_event.set()
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
+
+    def shutdown(self):
+        """Cancel any search and release the executor"""
+        self.cancel()
+        self.executor.shutdown(wait=False)